@@ -1,5 +1,5 @@
-from flask import Flask
-
 def create_app():
-    app = Flask(__name__)
-    return app
+    """Builds the Flask app; app.api (and Flask) is only imported when this is called."""
+    from app.api import create_app
+
+    return create_app()
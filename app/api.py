@@ -1,28 +1,104 @@
-from flask import Flask, request, jsonify
-from app.tasks import execute_task, read_file
+import os
+import time
+from flask import Flask, Response, g, request, jsonify, send_file
+from app.batch import execute_tasks
+from app.cache import task_cache
+from app.jobs import QueueFullError, get_job_queue
+from app.memo import result_store
+from app.metrics import registry
+from app.tasks import execute_task, prewarm, resolve_data_path
 
 def create_app():
     app = Flask(__name__)
+    app.config["USE_X_SENDFILE"] = os.getenv("USE_X_SENDFILE", "0") == "1"
+
+    # PREWARM=1 imports every handler dependency now instead of on first use;
+    # a comma-separated list of modules warms just those.
+    warm = os.getenv("PREWARM", "0")
+    if warm != "0":
+        prewarm(None if warm == "1" else [name.strip() for name in warm.split(",")])
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_latency(response):
+        start = g.get("request_start")
+        if start is not None:
+            registry.observe(
+                "agent_http_request_seconds",
+                time.perf_counter() - start,
+                method=request.method,
+                route=request.url_rule.rule if request.url_rule else "unmatched",
+                status=str(response.status_code),
+            )
+        return response
 
     @app.route("/run", methods=["POST"])
     def run_task():
         task = request.args.get("task")
         if not task:
             return jsonify({"error": "Task description required"}), 400
+
+        # Async mode: queue the task and let the client poll /jobs/<id>.
+        if request.args.get("mode", os.getenv("RUN_MODE", "sync")) == "async":
+            try:
+                job_id = get_job_queue().submit(task)
+            except QueueFullError as e:
+                return jsonify({"error": str(e)}), 429, {"Retry-After": "1"}
+            return jsonify({"job_id": job_id, "status": "queued"}), 202, {"Location": f"/jobs/{job_id}"}
+
+        try:
+            meta = {}
+            result = execute_task(task, meta)
+            return jsonify({"result": result, **meta}), 200
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": "Internal Server Error"}), 500
+
+    @app.route("/run/batch", methods=["POST"])
+    def run_batch():
+        payload = request.get_json(silent=True)
+        tasks = payload.get("tasks") if isinstance(payload, dict) else payload
+        if not isinstance(tasks, list) or not tasks or not all(isinstance(t, str) and t for t in tasks):
+            return jsonify({"error": "A non-empty list of task descriptions is required"}), 400
+        if len(tasks) > int(os.getenv("BATCH_MAX_TASKS", "500")):
+            return jsonify({"error": "Too many tasks in one batch"}), 400
         try:
-            result = execute_task(task)
-            return jsonify({"result": result}), 200
+            return jsonify({"results": execute_tasks(tasks)}), 200
         except ValueError as e:
             return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": "Internal Server Error"}), 500
 
+    @app.route("/jobs/<job_id>", methods=["GET"])
+    def job_status(job_id):
+        job = get_job_queue().get(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job), 200
+
     @app.route("/read", methods=["GET"])
     def read():
-        path = request.args.get("path")
-        content = read_file(path)
-        if content is None:
+        path = request.args.get("path", "")
+        resolved = resolve_data_path(path)
+        if resolved is None:
+            return f"The directory for the path '{path}' is invalid.", 200
+        path = resolved
+        if not os.path.isfile(path):
             return "", 404
-        return content, 200
+        # Streams the file (via wsgi.file_wrapper / X-Sendfile when available)
+        # with Range, ETag and Last-Modified handling.
+        return send_file(path, conditional=True, etag=True, max_age=0)
+
+    @app.route("/cache/stats", methods=["GET"])
+    def cache_stats():
+        return jsonify(dict(task_cache.stats(), results=result_store.stats())), 200
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
 
     return app
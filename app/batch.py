@@ -0,0 +1,126 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.cache import task_cache, task_key
+from app.tasks import interpret_locally, run_structured_task
+from app.utils import query_llm
+
+CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "20"))
+WORKERS = int(os.getenv("BATCH_WORKERS", "8"))
+TOKENS_PER_TASK = 120
+
+
+def _interpret_chunk(descriptions):
+    """Interprets several task descriptions with a single LLM call."""
+    numbered = "\n".join(f"{i + 1}. {d}" for i, d in enumerate(descriptions))
+    response = query_llm(
+        f"Extract the following details from each of these task descriptions: "
+        f"1. Action (e.g., count, format, sort, extract, etc.). "
+        f"2. Input file path. "
+        f"3. Output file path. "
+        f"4. Additional parameters (e.g., day of the week, ticket type, etc.). "
+        f"Return only a JSON array with one object per task, in the same order, each with the keys "
+        f"action, input_path, output_path and parameters. Task descriptions:\n{numbered}",
+        max_tokens=TOKENS_PER_TASK * len(descriptions),
+    )
+
+    try:
+        # Tolerate prose or code fences around the array.
+        task_infos = json.loads(response[response.index("["):response.rindex("]") + 1])
+    except ValueError:
+        return ["Error: Unable to parse task description."] * len(descriptions)
+    if not isinstance(task_infos, list) or len(task_infos) != len(descriptions):
+        return ["Error: Unable to parse task description."] * len(descriptions)
+
+    results = []
+    for description, task_info in zip(descriptions, task_infos):
+        if isinstance(task_info, dict):
+            task_cache.put(description, task_info)
+            results.append(task_info)
+        else:
+            results.append("Error: Unable to parse task description.")
+    return results
+
+
+def interpret_tasks(task_descriptions):
+    """Interprets many tasks, sending the ones that need the LLM in chunked prompts.
+
+    Returns a list of (task_info, source) tuples in input order.
+    """
+    interpretations = [None] * len(task_descriptions)
+    pending = {}
+    for i, description in enumerate(task_descriptions):
+        task_info, source = interpret_locally(description)
+        if task_info is not None:
+            interpretations[i] = (task_info, source)
+        else:
+            # Identical descriptions in one batch share a single slot in the prompt.
+            pending.setdefault(task_key(description), []).append(i)
+
+    keys = list(pending)
+    for start in range(0, len(keys), CHUNK_SIZE):
+        chunk = keys[start:start + CHUNK_SIZE]
+        descriptions = [task_descriptions[pending[key][0]] for key in chunk]
+        for key, task_info in zip(chunk, _interpret_chunk(descriptions)):
+            for i in pending[key]:
+                interpretations[i] = (task_info, "llm")
+    return interpretations
+
+
+def _conflict_groups(task_infos):
+    """Groups task indexes so that tasks touching the same output run in order."""
+    outputs = {info.get("output_path") for info in task_infos if info}
+    parent = list(range(len(task_infos)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner = {}
+    for i, info in enumerate(task_infos):
+        if not info:
+            continue
+        paths = {info.get("output_path")}
+        if info.get("input_path") in outputs:
+            paths.add(info.get("input_path"))
+        for path in paths:
+            if path in owner:
+                parent[find(i)] = find(owner[path])
+            else:
+                owner[path] = i
+
+    groups = {}
+    for i, info in enumerate(task_infos):
+        if info:
+            groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def execute_tasks(task_descriptions):
+    """Interprets and runs a batch of tasks, concurrently where outputs don't conflict.
+
+    Returns one result dict per task, in input order.
+    """
+    interpretations = interpret_tasks(task_descriptions)
+    results = []
+    for description, (task_info, source) in zip(task_descriptions, interpretations):
+        result = {"task": description, "interpreted_by": source}
+        if isinstance(task_info, str):
+            result["error"] = task_info
+        results.append(result)
+
+    task_infos = [info if isinstance(info, dict) else None for info, _ in interpretations]
+
+    def run_group(indexes):
+        for i in indexes:
+            try:
+                results[i]["result"] = run_structured_task(task_infos[i], task_descriptions[i], results[i])
+            except Exception as e:
+                results[i]["error"] = str(e)
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        list(pool.map(run_group, _conflict_groups(task_infos)))
+    return results
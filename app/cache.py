@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.metrics import registry
+from app.utils import cache_path
+
+# Paths, URLs, quoted literals and SQL are case-sensitive, so they are kept
+# verbatim when normalizing: a SQL query runs from SELECT to the end of the task.
+_CASE_SENSITIVE_TOKEN = re.compile(
+    r"""(?:https?://|/)\S*|(?<!\w)'[^']*'|"[^"]*"|`[^`]*`|(?i:\bselect\b.+?\bfrom\b.*)"""
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_task(task_description):
+    """Returns a canonical form of a task description (whitespace and case folded)."""
+    text = _WHITESPACE.sub(" ", task_description or "").strip()
+    parts = []
+    last = 0
+    for match in _CASE_SENSITIVE_TOKEN.finditer(text):
+        parts.append(text[last:match.start()].lower())
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(text[last:].lower())
+    return "".join(parts)
+
+
+def task_key(task_description):
+    """Returns the stable cache key for a task description."""
+    return hashlib.sha256(normalize_task(task_description).encode("utf-8")).hexdigest()
+
+
+class TaskCache:
+    """Bounded in-memory LRU with TTL, backed by an on-disk SQLite store."""
+
+    def __init__(self, db_path=None, max_entries=1024, ttl=86400):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None and self.db_path:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS task_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, task_description):
+        """Returns the cached interpretation for a task, or None."""
+        key = task_key(task_description)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                registry.inc("agent_cache_lookups_total", cache="interpretations", result="hit")
+                return json.loads(entry[0])
+            self._entries.pop(key, None)
+
+            row = None
+            conn = self._db()
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT value, created FROM task_cache WHERE key = ?", (key,)
+                ).fetchone()
+            if row is not None and now - row[1] < self.ttl:
+                self._remember(key, row[0], row[1])
+                registry.inc("agent_cache_lookups_total", cache="interpretations", result="hit")
+                return json.loads(row[0])
+
+            registry.inc("agent_cache_lookups_total", cache="interpretations", result="miss")
+            return None
+
+    def put(self, task_description, task_info):
+        """Stores a successfully parsed interpretation."""
+        if not isinstance(task_info, dict):
+            return
+        key = task_key(task_description)
+        value = json.dumps(task_info, sort_keys=True)
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            conn = self._db()
+            if conn is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO task_cache (key, value, created) VALUES (?, ?, ?)",
+                    (key, value, now),
+                )
+                conn.execute("DELETE FROM task_cache WHERE created < ?", (now - self.ttl,))
+                conn.commit()
+
+    def _remember(self, key, value, created):
+        self._entries[key] = (value, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """Returns hit/miss counters (summed over every server worker) for the cache."""
+        hits = registry.value("agent_cache_lookups_total", cache="interpretations", result="hit")
+        misses = registry.value("agent_cache_lookups_total", cache="interpretations", result="miss")
+        with self._lock:
+            conn = self._db()
+            entries = conn.execute("SELECT COUNT(*) FROM task_cache").fetchone()[0] if conn else len(self._entries)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "entries": entries,
+        }
+
+
+task_cache = TaskCache(
+    db_path=cache_path("task_cache.db") if os.getenv("TASK_CACHE_PERSIST", "1") != "0" else None,
+    max_entries=int(os.getenv("TASK_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("TASK_CACHE_TTL", "86400")),
+)
@@ -0,0 +1,150 @@
+import heapq
+import json
+import os
+import tempfile
+
+DEFAULT_KEYS = ("last_name", "first_name")
+MAX_MEMORY = int(os.getenv("SORT_MAX_MEMORY_MB", "256")) * 1024 * 1024
+READ_SIZE = 1024 * 1024
+MERGE_FAN_IN = 64
+_NUMBER_CHARS = "0123456789+-.eE"
+# Parsed dicts take several times the space of their JSON text.
+OBJECT_OVERHEAD = 4
+
+
+def iter_json_array(file, read_size=READ_SIZE):
+    """Yields (item, text_size) for each element of a top-level JSON array without loading it whole."""
+    decoder = json.JSONDecoder()
+    buffer = file.read(read_size)
+    eof = not buffer
+    pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while pos < len(buffer) and buffer[pos] in chars:
+            pos += 1
+
+    def refill():
+        nonlocal buffer, pos, eof
+        data = file.read(read_size)
+        eof = not data
+        buffer = buffer[pos:] + data
+        pos = 0
+        return not eof
+
+    skip(" \t\r\n")
+    while pos >= len(buffer) and refill():
+        skip(" \t\r\n")
+    if buffer[pos:pos + 1] != "[":
+        raise ValueError("Expected a JSON array.")
+    pos += 1
+
+    expect_item = True
+    while True:
+        skip(" \t\r\n")
+        if pos >= len(buffer):
+            if refill():
+                continue
+            raise ValueError("Unexpected end of JSON array.")
+        if buffer[pos] == "]":
+            return
+        if not expect_item:
+            if buffer[pos] != ",":
+                raise ValueError(f"Expected ',' in JSON array at offset {pos}.")
+            pos += 1
+            expect_item = True
+            continue
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if refill():
+                continue
+            raise
+        if isinstance(item, (int, float)) and not eof and not buffer[end:].strip(_NUMBER_CHARS) and refill():
+            # A number cut off by the read ("2." or "1e") may continue in the next one.
+            continue
+        yield item, end - pos
+        pos = end
+        expect_item = False
+        if pos > read_size:
+            buffer = buffer[pos:]
+            pos = 0
+
+
+def _write_array(items, file):
+    # Same layout as json.dump(list, file).
+    file.write("[")
+    for i, item in enumerate(items):
+        if i:
+            file.write(", ")
+        file.write(json.dumps(item))
+    file.write("]")
+
+
+def _write_run(items, directory):
+    fd, path = tempfile.mkstemp(suffix=".jsonl", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        for item in items:
+            file.write(json.dumps(item))
+            file.write("\n")
+    return path
+
+
+def _read_run(path):
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def sort_contacts(input_path, output_path, keys=DEFAULT_KEYS, max_memory=MAX_MEMORY):
+    """Sorts a JSON array of contacts by `keys`, keeping memory near `max_memory`.
+
+    Inputs that fit in memory are sorted directly. Larger ones are spilled as
+    sorted runs to temporary files, k-way merged, and streamed to `output_path`.
+    Returns the number of contacts written.
+    """
+    keys = tuple(keys)
+
+    def sort_key(contact):
+        return tuple(contact.get(key, "") for key in keys)
+
+    with tempfile.TemporaryDirectory(prefix="sort-", dir=os.getenv("SORT_TMPDIR")) as tmp_dir:
+        runs = []
+        batch = []
+        batch_size = 0
+        count = 0
+        with open(input_path, "r", encoding="utf-8") as file:
+            for contact, size in iter_json_array(file):
+                batch.append(contact)
+                batch_size += size * OBJECT_OVERHEAD
+                count += 1
+                if batch_size >= max_memory:
+                    batch.sort(key=sort_key)
+                    runs.append(_write_run(batch, tmp_dir))
+                    batch = []
+                    batch_size = 0
+
+        batch.sort(key=sort_key)
+        if not runs:
+            with open(output_path, "w", encoding="utf-8") as file:
+                _write_array(batch, file)
+            return count
+        if batch:
+            runs.append(_write_run(batch, tmp_dir))
+        del batch
+
+        # Bound the number of open files by merging in passes. Neighbouring
+        # runs are merged together so equal keys keep their input order.
+        while len(runs) > MERGE_FAN_IN:
+            merged = []
+            for start in range(0, len(runs), MERGE_FAN_IN):
+                group = runs[start:start + MERGE_FAN_IN]
+                merged.append(_write_run(heapq.merge(*map(_read_run, group), key=sort_key), tmp_dir))
+                for path in group:
+                    os.remove(path)
+            runs = merged
+
+        with open(output_path, "w", encoding="utf-8") as file:
+            _write_array(heapq.merge(*map(_read_run, runs), key=sort_key), file)
+    return count
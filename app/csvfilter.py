@@ -0,0 +1,298 @@
+import csv
+import datetime
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", "100000"))
+ENGINE = os.getenv("CSV_ENGINE", "pandas")
+
+_OP_ALIASES = {
+    "=": "==", "eq": "==", "equals": "==", "ne": "!=", "<>": "!=",
+    "gt": ">", "ge": ">=", "gte": ">=", "lt": "<", "le": "<=", "lte": "<=",
+    "not_in": "not in", "is null": "isnull", "is not null": "notnull",
+}
+_COMPARISONS = {
+    "==": np.equal, "!=": np.not_equal, ">": np.greater,
+    ">=": np.greater_equal, "<": np.less, "<=": np.less_equal,
+}
+
+
+def parse_filters(parameters):
+    """Normalizes filter specs from task parameters into [{"column", "op", "value"}].
+
+    Accepts a "filters" list of {"column", "op", "value"} dicts, a "filters"
+    dict of {column: value} equality tests, or top-level "column"/"op"/"value".
+    """
+    filters = parameters.get("filters")
+    if filters is None and "column" in parameters:
+        filters = [{key: parameters[key] for key in ("column", "op", "value") if key in parameters}]
+    if isinstance(filters, dict):
+        filters = [{"column": column, "op": "==", "value": value} for column, value in filters.items()]
+
+    specs = []
+    for spec in filters or []:
+        op = str(spec.get("op", "==")).strip().lower()
+        op = _OP_ALIASES.get(op, op)
+        if op not in _COMPARISONS and op not in ("in", "not in", "contains", "startswith", "endswith", "isnull", "notnull"):
+            raise ValueError(f"Unsupported filter operator: {spec.get('op')}")
+        specs.append({"column": spec["column"], "op": op, "value": spec.get("value")})
+    return specs
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _filter_dtypes(filters, dtypes):
+    """Reads columns compared against strings as strings, so e.g. "007" stays "007"."""
+    dtypes = dict(dtypes or {})
+    for spec in filters:
+        value = spec["value"]
+        values = value if isinstance(value, (list, tuple)) else [value]
+        if spec["column"] not in dtypes and values and all(isinstance(v, str) for v in values):
+            dtypes[spec["column"]] = "string"
+    return dtypes
+
+
+def build_mask(frame, filters):
+    """Returns a boolean mask of the rows in `frame` matching every filter."""
+    mask = np.ones(len(frame), dtype=bool)
+    for spec in filters:
+        column = frame[spec["column"]]
+        op, value = spec["op"], spec["value"]
+        if op == "isnull":
+            result = column.isna()
+        elif op == "notnull":
+            result = column.notna()
+        elif op in ("in", "not in"):
+            result = column.isin(value if isinstance(value, (list, tuple, set)) else [value])
+            if op == "not in":
+                result = ~result
+        elif op in ("contains", "startswith", "endswith"):
+            text = column.astype("string")
+            if op == "contains":
+                result = text.str.contains(str(value), regex=False)
+            else:
+                result = getattr(text.str, op)(str(value))
+        else:
+            if _is_number(value) and not pd.api.types.is_numeric_dtype(column):
+                column = pd.to_numeric(column, errors="coerce")
+            result = _COMPARISONS[op](column, value)
+        mask &= np.asarray(pd.Series(result).fillna(False), dtype=bool)
+    return mask
+
+
+# Each chunk's columns are kept to one dtype, widened along this chain (and
+# the file re-read) when a later chunk does not fit.
+# "string" stays "string" but makes the re-read take that column as raw text.
+_WIDER = {"boolean": "string", "Int64": "Float64", "Float64": "string", "string": "string"}
+
+
+class _WidenColumn(Exception):
+    def __init__(self, column):
+        super().__init__(column)
+        self.column = column
+        self.pins = None
+
+
+def _is_objects(frame, column, dtype, types):
+    if dtype != object:
+        return False
+    # Text columns are object dtype in pandas < 3; stop at their first value.
+    found = False
+    for value in frame[column].to_numpy():
+        if isinstance(value, types):
+            found = True
+        elif not pd.isna(value):
+            return False
+    return found
+
+
+def _is_bool_objects(frame, column, dtype):
+    # True/False columns with gaps are parsed as Python bools in an object column.
+    return _is_objects(frame, column, dtype, (bool, np.bool_))
+
+
+def _is_temporal(frame, column, dtype):
+    # pyarrow parses ISO dates and times, which pandas leaves as text.
+    return (pd.api.types.is_datetime64_any_dtype(dtype)
+            or _is_objects(frame, column, dtype, (datetime.date, datetime.time)))
+
+
+def _pin_dtypes(frame, fixed):
+    """Picks the dtype every chunk's columns are cast to from the first chunk.
+
+    Floats that are all whole numbers (an int column with gaps) pin to Int64,
+    so a value prints the same whichever chunk holds the column's nulls.
+    """
+    pins = {}
+    for column, dtype in frame.dtypes.items():
+        if column in fixed:
+            continue
+        if pd.api.types.is_bool_dtype(dtype) or _is_bool_objects(frame, column, dtype):
+            pins[column] = "boolean"
+        elif pd.api.types.is_integer_dtype(dtype):
+            pins[column] = "Int64"
+        elif pd.api.types.is_float_dtype(dtype):
+            values = frame[column].to_numpy(dtype=float)
+            pins[column] = "Int64" if np.all(np.isnan(values) | (values % 1 == 0)) else "Float64"
+        else:
+            pins[column] = "string"
+    return pins
+
+
+def _cast(chunk, pins):
+    """Casts the columns of a chunk whose parsed type differs from their pinned dtype.
+
+    Columns that already print the same way (int64 for Int64, float64 for
+    Float64, bools with or without gaps for boolean, text for string) are
+    left alone.
+    """
+    for column, dtype in chunk.dtypes.items():
+        pin = pins.get(column)
+        if pin is None:
+            continue
+        is_bool = pd.api.types.is_bool_dtype(dtype)
+        is_number = not is_bool and pd.api.types.is_numeric_dtype(dtype)
+        if pin == "string":
+            if is_bool or is_number or _is_bool_objects(chunk, column, dtype) or _is_temporal(chunk, column, dtype):
+                # Parsed as booleans, numbers or dates in this chunk; re-read the column as text.
+                raise _WidenColumn(column)
+        elif pin == "boolean":
+            if not is_bool and chunk[column].notna().any() and not _is_bool_objects(chunk, column, dtype):
+                raise _WidenColumn(column)
+        elif not is_number:
+            raise _WidenColumn(column)
+        elif pin == "Int64" and not pd.api.types.is_integer_dtype(dtype) or pin == "Float64" and not pd.api.types.is_float_dtype(dtype):
+            try:
+                chunk[column] = chunk[column].astype(pin)
+            except (TypeError, ValueError):
+                raise _WidenColumn(column)
+    return chunk
+
+
+def _pandas_chunks(path, usecols, dtypes, pins, chunk_rows):
+    # Pins other than "string" are applied by _cast, which widens instead of failing.
+    return pd.read_csv(path, usecols=usecols, dtype=dtypes or None, chunksize=chunk_rows)
+
+
+_ARROW_TYPES = {"boolean": "bool", "Int64": "int64", "Float64": "float64", "string": "string"}
+
+
+def _failed_column(path, error):
+    # pyarrow names the column a value failed to convert in by its position in the file.
+    match = re.match(r"In CSV column #(\d+)", str(error))
+    if match is None:
+        return None
+    with open(path, newline="", encoding="utf-8") as file:
+        header = next(csv.reader(file), [])
+    index = int(match.group(1))
+    return header[index] if index < len(header) else None
+
+
+def _pyarrow_chunks(path, usecols, dtypes, pins, chunk_rows):
+    import pyarrow
+    from pyarrow import csv as arrow_csv
+
+    column_types = {column: _ARROW_TYPES[dtype] for column, dtype in (pins or {}).items()}
+    column_types.update({column: "string" for column, dtype in (dtypes or {}).items() if dtype == "string"})
+    reader = arrow_csv.open_csv(
+        path,
+        read_options=arrow_csv.ReadOptions(block_size=max(chunk_rows, 1) * 256),
+        convert_options=arrow_csv.ConvertOptions(
+            include_columns=usecols,
+            column_types=column_types,
+            strings_can_be_null=True,
+        ),
+    )
+    batches = iter(reader)
+    while True:
+        try:
+            batch = next(batches)
+        except StopIteration:
+            return
+        except pyarrow.ArrowInvalid as e:
+            # Column types are inferred from the first block; a later block that does not fit fails.
+            column = _failed_column(path, e)
+            if column is None:
+                raise
+            raise _WidenColumn(column)
+        yield batch.to_pandas()
+
+
+def filter_csv(input_path, output_path, filters=(), columns=None, output_format="json",
+               chunk_rows=CHUNK_ROWS, dtypes=None, engine=ENGINE):
+    """Streams the rows of a CSV that match `filters` to `output_path` as JSON.
+
+    The file is read `chunk_rows` rows at a time, with only the needed
+    columns, and each chunk is filtered with a vectorized mask, so peak memory
+    follows the chunk size rather than the file size. Column types come from
+    the first chunk as nullable dtypes and are widened (re-reading the file)
+    if a later chunk needs it, so the output does not depend on `chunk_rows`.
+    `output_format` is "json" (one array) or "jsonl". `engine` is "pandas",
+    "pyarrow" or "auto". Returns the number of rows written.
+    """
+    if output_format not in ("json", "jsonl"):
+        raise ValueError(f"Unsupported output format: {output_format}")
+    usecols = None
+    if columns:
+        usecols = list(dict.fromkeys(list(columns) + [spec["column"] for spec in filters]))
+    dtypes = _filter_dtypes(filters, dtypes)
+
+    if engine == "auto":
+        try:
+            import pyarrow.csv  # noqa: F401
+            engine = "pyarrow"
+        except ImportError:
+            engine = "pandas"
+    read_chunks = _pyarrow_chunks if engine == "pyarrow" else _pandas_chunks
+
+    pins = None
+    while True:
+        try:
+            return _write_chunks(read_chunks, input_path, output_path, filters, columns, output_format,
+                                 chunk_rows, usecols, dtypes, pins)
+        except _WidenColumn as e:
+            pins = e.pins
+            pins[e.column] = _WIDER[pins[e.column]]
+
+
+def _write_chunks(read_chunks, input_path, output_path, filters, columns, output_format,
+                  chunk_rows, usecols, dtypes, pins):
+    # After a re-read, text columns are read as text so e.g. "007" is not parsed as a number.
+    read_dtypes = dict(dtypes, **{column: "string" for column, dtype in (pins or {}).items() if dtype == "string"})
+    count = 0
+    with open(output_path, "w") as file:
+        if output_format == "json":
+            file.write("[")
+        chunks = read_chunks(input_path, usecols, read_dtypes, pins, chunk_rows)
+        while True:
+            try:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                if pins is None:
+                    pins = _pin_dtypes(chunk, set(dtypes))
+                chunk = _cast(chunk, pins)
+            except _WidenColumn as e:
+                e.pins = pins
+                raise
+            if filters:
+                chunk = chunk[build_mask(chunk, filters)]
+            if columns:
+                chunk = chunk[list(columns)]
+            if chunk.empty:
+                continue
+            if output_format == "jsonl":
+                file.write(chunk.to_json(orient="records", lines=True).rstrip("\n") + "\n")
+            else:
+                if count:
+                    file.write(",")
+                file.write(chunk.to_json(orient="records")[1:-1])
+            count += len(chunk)
+        if output_format == "json":
+            file.write("]")
+    return count
@@ -0,0 +1,173 @@
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+
+from app.metrics import timed
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+FETCH_SIZE = int(os.getenv("DB_FETCH_SIZE", "1000"))
+# Only safe when nothing writes to the databases while the app is running.
+IMMUTABLE = os.getenv("DB_IMMUTABLE", "0") == "1"
+SQLITE_PRAGMAS = (
+    "PRAGMA query_only = 1",
+    f"PRAGMA mmap_size = {int(os.getenv('DB_MMAP_SIZE', str(256 * 1024 * 1024)))}",
+    f"PRAGMA cache_size = -{int(os.getenv('DB_CACHE_KB', '65536'))}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+class QueryError(Exception):
+    """Raised when a query fails in either SQLite or DuckDB."""
+    pass
+
+
+def is_duckdb(path):
+    """Returns True if the file looks like a DuckDB database."""
+    if path.endswith((".duckdb", ".ddb")):
+        return True
+    try:
+        with open(path, "rb") as file:
+            return file.read(12)[8:12] == b"DUCK"
+    except OSError:
+        return False
+
+
+def _open_sqlite(path):
+    uri = f"file:{quote(os.path.abspath(path))}?mode=ro"
+    if IMMUTABLE:
+        uri += "&immutable=1"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=256)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _open_duckdb(path):
+    try:
+        import duckdb
+    except ImportError:
+        raise QueryError("duckdb is not installed.")
+    try:
+        # read_only does not stop read_csv() or COPY ... TO from touching other files.
+        return duckdb.connect(path, read_only=True, config={"enable_external_access": False})
+    except duckdb.Error as e:
+        raise QueryError(str(e))
+
+
+class _Pool:
+    def __init__(self, opener, path):
+        self.opener = opener
+        self.path = path
+        self.idle = queue.LifoQueue(maxsize=POOL_SIZE)
+        self.retired = False
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return self.opener(self.path)
+
+    def release(self, conn):
+        if not self.retired:
+            try:
+                self.idle.put_nowait(conn)
+                return
+            except queue.Full:
+                pass
+        conn.close()
+
+    def retire(self):
+        self.retired = True
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_for(path):
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        raise QueryError(str(e))
+    # A replaced file (new inode) or, for immutable connections, any change
+    # gets a fresh pool; the stale one is drained.
+    version = (stat.st_dev, stat.st_ino) + ((stat.st_mtime_ns, stat.st_size) if IMMUTABLE else ())
+    real_path = os.path.realpath(path)
+    with _pools_lock:
+        current = _pools.get(real_path)
+        if current is not None and current[0] == version:
+            return current[1]
+        pool = _Pool(_open_duckdb if is_duckdb(path) else _open_sqlite, path)
+        _pools[real_path] = (version, pool)
+    if current is not None:
+        current[1].retire()
+    return pool
+
+
+@contextmanager
+def connect(path):
+    """Yields a pooled read-only connection (SQLite or DuckDB) for `path`."""
+    pool = _pool_for(path)
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+def _is_db_error(error):
+    duckdb = sys.modules.get("duckdb")
+    return isinstance(error, sqlite3.Error) or (duckdb is not None and isinstance(error, duckdb.Error))
+
+
+@timed("db")
+def query_value(path, sql, params=()):
+    """Runs a query with bound parameters and returns the first column of the first row."""
+    with connect(path) as conn:
+        try:
+            row = conn.execute(sql, params).fetchone()
+        except Exception as e:
+            if _is_db_error(e):
+                raise QueryError(str(e))
+            raise
+    return row[0] if row else None
+
+
+@timed("db")
+def stream_query(path, sql, output_path, params=(), fetch_size=FETCH_SIZE):
+    """Runs a query and streams the rows to `output_path` as a JSON array of arrays.
+
+    Rows are fetched in batches, so memory stays flat for large results.
+    Returns the number of rows written.
+    """
+    count = 0
+    with connect(path) as conn:
+        try:
+            cursor = conn.execute(sql, params)
+            with open(output_path, "w") as file:
+                file.write("[")
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        if count:
+                            file.write(", ")
+                        file.write(json.dumps(list(row), default=str))
+                        count += 1
+                file.write("]")
+        except Exception as e:
+            if _is_db_error(e):
+                raise QueryError(str(e))
+            raise
+    return count
@@ -0,0 +1,33 @@
+from email import policy
+from email.parser import BytesHeaderParser
+from email.utils import getaddresses
+
+MAX_HEADER_BYTES = 64 * 1024
+
+
+def read_header_block(path, limit=MAX_HEADER_BYTES):
+    """Returns the raw RFC 5322 header block of a message file (up to the first blank line)."""
+    lines = []
+    size = 0
+    with open(path, "rb") as file:
+        for line in file:
+            if not line.strip(b"\r\n"):
+                break
+            lines.append(line)
+            size += len(line)
+            if size >= limit:
+                break
+    return b"".join(lines)
+
+
+def sender_address(path, header="From"):
+    """Returns the first address in a message's From header (e.g. "a@b.com"), or None.
+
+    Only the header block is read, however long the body is.
+    """
+    headers = BytesHeaderParser(policy=policy.compat32).parsebytes(read_header_block(path))
+    values = headers.get_all(header) or []
+    for _, address in getaddresses([str(value) for value in values]):
+        if "@" in address:
+            return address
+    return None
@@ -0,0 +1,161 @@
+import hashlib
+import heapq
+import os
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+from app.utils import cache_path
+
+BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+BLOCK_SIZE = int(os.getenv("SIMILARITY_BLOCK_SIZE", "2048"))
+LOCAL_DIMS = 512
+
+BACKENDS = {}
+
+
+def register_backend(name):
+    """Registers a function taking (texts, model) and returning one vector per text."""
+    def decorator(function):
+        BACKENDS[name] = function
+        return function
+    return decorator
+
+
+@register_backend("openai")
+def _openai_embed(texts, model):
+    from app.llm import get_client
+
+    return get_client().embed(texts, model=model)
+
+
+_WORD = re.compile(r"\w+")
+
+
+@register_backend("local")
+def _local_embed(texts, model):
+    """Deterministic stand-in: signed feature hashing of words and character trigrams."""
+    vectors = np.zeros((len(texts), LOCAL_DIMS), dtype=np.float32)
+    for row, text in enumerate(texts):
+        text = text.lower()
+        features = _WORD.findall(text)
+        padded = f" {text} "
+        features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % LOCAL_DIMS
+            vectors[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+    return vectors
+
+
+def default_backend():
+    """Returns EMBEDDING_BACKEND, or "openai" when an LLM endpoint is configured and "local" otherwise."""
+    configured = os.getenv("EMBEDDING_BACKEND")
+    if configured:
+        return configured
+    return "openai" if os.getenv("OPENAI_API_KEY") or os.getenv("LLM_BASE_URL") else "local"
+
+
+class EmbeddingCache:
+    """On-disk vector store keyed by a hash of (backend, model, text)."""
+
+    def __init__(self, db_path):
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM vectors WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items],
+            )
+            self._conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(cache_path("embeddings.db"))
+    return _cache
+
+
+def embed_texts(texts, backend=None, model=None, batch_size=BATCH_SIZE):
+    """Returns an (N, dims) float32 array of L2-normalized embeddings for `texts`.
+
+    Vectors are cached on disk by content hash and missing ones are requested
+    from the backend in batches.
+    """
+    backend = backend or default_backend()
+    model = model or os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    embed = BACKENDS[backend]
+
+    keys = [hashlib.sha256(f"{backend}\0{model}\0{text}".encode("utf-8")).hexdigest() for text in texts]
+    vectors = _get_cache().get_many(list(set(keys)))
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors:
+            missing.setdefault(key, text)
+    missing_keys = list(missing)
+    for start in range(0, len(missing_keys), batch_size):
+        batch = missing_keys[start:start + batch_size]
+        batch_vectors = embed([missing[key] for key in batch], model)
+        new = list(zip(batch, batch_vectors))
+        _get_cache().put_many(new)
+        vectors.update((key, np.asarray(vector, dtype=np.float32)) for key, vector in new)
+
+    matrix = np.stack([vectors[key] for key in keys]).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def most_similar_pairs(vectors, top_k=1, block_size=BLOCK_SIZE):
+    """Returns the `top_k` (score, i, j) pairs with i < j by cosine similarity, best first.
+
+    `vectors` must be L2-normalized. The similarity matrix is computed in
+    block_size x block_size tiles, so memory does not grow with N squared.
+    """
+    count = len(vectors)
+    best = []  # min-heap of (score, i, j)
+    for i0 in range(0, count, block_size):
+        rows = vectors[i0:i0 + block_size]
+        for j0 in range(i0, count, block_size):
+            scores = rows @ vectors[j0:j0 + block_size].T
+            if i0 == j0:
+                scores[np.tril_indices(len(rows), m=scores.shape[1])] = -np.inf
+            flat = scores.ravel()
+            k = min(top_k, flat.size)
+            candidates = [flat.argmax()] if k == 1 else np.argpartition(flat, -k)[-k:]
+            for index in candidates:
+                score = float(flat[index])
+                if score == -np.inf:
+                    continue
+                i, j = divmod(int(index), scores.shape[1])
+                item = (score, i0 + i, j0 + j)
+                if len(best) < top_k:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+    return sorted(best, reverse=True)
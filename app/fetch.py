@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.metrics import timed
+from app.utils import cache_path
+
+TIMEOUT = (float(os.getenv("FETCH_CONNECT_TIMEOUT", "5")), float(os.getenv("FETCH_READ_TIMEOUT", "30")))
+POOL_SIZE = int(os.getenv("FETCH_POOL_SIZE", "8"))
+CHUNK_SIZE = 64 * 1024
+CACHE_ENABLED = os.getenv("FETCH_CACHE", "1") != "0"
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_MAX_AGE = re.compile(r"max-age\s*=\s*(\d+)")
+
+
+def get_session(url):
+    """Returns the pooled session for the URL's scheme and host."""
+    parts = urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    with _sessions_lock:
+        session = _sessions.get(origin)
+        if session is None:
+            session = requests.Session()
+            session.mount(origin, HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE))
+            _sessions[origin] = session
+    return session
+
+
+def _cache_paths(url):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    directory = cache_path("http")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, key + ".json"), os.path.join(directory, key + ".body")
+
+
+def _load_meta(meta_path, body_path):
+    try:
+        with open(meta_path, "r") as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return meta if os.path.exists(body_path) else None
+
+
+def _freshness(headers):
+    """Returns (cacheable, max_age) from a response's Cache-Control header."""
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-store" in cache_control:
+        return False, 0
+    if "no-cache" in cache_control:
+        return True, 0
+    match = _MAX_AGE.search(cache_control)
+    return True, int(match.group(1)) if match else 0
+
+
+def _save_meta(meta_path, meta):
+    tmp_path = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(meta, file)
+    os.replace(tmp_path, meta_path)
+
+
+@timed("network")
+def fetch_to_file(url, output_path, use_cache=CACHE_ENABLED):
+    """Downloads `url` to `output_path` in chunks and returns the response's metadata.
+
+    Responses are kept in an on-disk cache: fresh entries (Cache-Control
+    max-age) are served without a request, stale ones are revalidated with
+    If-None-Match / If-Modified-Since. The returned dict has a "cache" key of
+    "miss", "fresh" or "revalidated". Raises requests.RequestException on failure.
+    """
+    meta_path, body_path = _cache_paths(url)
+    meta = _load_meta(meta_path, body_path) if use_cache else None
+
+    if meta is not None and time.time() - meta["stored_at"] < meta["max_age"]:
+        shutil.copyfile(body_path, output_path)
+        return dict(meta, cache="fresh")
+
+    headers = {}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    with get_session(url).get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+        cacheable, max_age = _freshness(response.headers)
+
+        if response.status_code == 304 and meta is not None:
+            meta.update(stored_at=time.time(), max_age=max_age)
+            if response.headers.get("ETag"):
+                meta["etag"] = response.headers["ETag"]
+            _save_meta(meta_path, meta)
+            shutil.copyfile(body_path, output_path)
+            return dict(meta, cache="revalidated")
+
+        response.raise_for_status()
+        cacheable = use_cache and cacheable and (
+            "ETag" in response.headers or "Last-Modified" in response.headers or max_age > 0
+        )
+        tmp_body = f"{body_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        cache_file = open(tmp_body, "wb") if cacheable else None
+        try:
+            with open(output_path, "wb") as file:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    file.write(chunk)
+                    if cache_file is not None:
+                        cache_file.write(chunk)
+        except BaseException:
+            if cache_file is not None:
+                cache_file.close()
+                os.remove(tmp_body)
+            raise
+
+        meta = {
+            "url": url,
+            "status": response.status_code,
+            "content_type": response.headers.get("Content-Type", ""),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "stored_at": time.time(),
+            "max_age": max_age,
+        }
+        if cache_file is not None:
+            cache_file.close()
+            os.replace(tmp_body, body_path)
+            _save_meta(meta_path, meta)
+    return dict(meta, cache="miss")
@@ -0,0 +1,423 @@
+import hashlib
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+
+from app.utils import cache_path
+
+# "auto" falls back to the Python approximation where Node is missing; opt in explicitly.
+BACKEND = os.getenv("FORMATTER_BACKEND", "prettier")
+BATCH_WINDOW = float(os.getenv("FORMATTER_BATCH_MS", "0")) / 1000
+MAX_BATCH = int(os.getenv("FORMATTER_MAX_BATCH", "64"))
+HASH_LIMIT = int(os.getenv("FORMATTER_HASH_LIMIT", "100000"))
+TIMEOUT = float(os.getenv("FORMATTER_TIMEOUT", "120"))
+
+
+class FormatterError(Exception):
+    """Raised when a file cannot be formatted."""
+    pass
+
+
+class FormatterNotFound(FormatterError):
+    """Raised when the prettier backend is requested but Node/npx is not available."""
+    pass
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# -- Pure-Python Markdown backend --------------------------------------------
+
+_FENCE = re.compile(r"^( {0,3})(`{3,}|~{3,})")
+_INDENTED = re.compile(r"^(?: {4}| {0,3}\t)")
+_LIST_ITEM = re.compile(r"^ *(?:[-*+]|\d{1,9}[.)])(?:[ \t]|$)")
+# HTML block starts (CommonMark types 1-7) and the text that ends each; None ends at a blank line.
+_HTML_START = re.compile(
+    r"^ {0,3}<(?:(?P<raw>script|pre|style|textarea)(?=[\s>]|$)|(?P<comment>!--)|(?P<pi>\?)"
+    r"|(?P<cdata>!\[CDATA\[)|(?P<decl>![A-Za-z])|(?P<tag>/?[A-Za-z][\w-]*)(?=[\s/>]|$))",
+    re.IGNORECASE,
+)
+_HTML_END = {"comment": "-->", "pi": "?>", "cdata": "]]>", "decl": ">"}
+_ATX = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_SETEXT = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+_RULE = re.compile(r"^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+_BULLET = re.compile(r"^( *)[-*+][ \t]+(?=\S)")
+_ORDERED = re.compile(r"^( *)(\d{1,9})([.)])[ \t]+(?=\S)")
+_TABLE_DELIMITER = re.compile(r"^ *\|? *:?-+:? *(?:\| *:?-+:? *)*\|? *$")
+_CODE_SPAN = re.compile(r"(`+).+?\1")
+_STRONG = re.compile(r"(?<![\w_])__(?=\S)(.+?)(?<=\S)__(?![\w_])")
+_EM = re.compile(r"(?<![\w*])\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?![\w*])")
+
+
+def _format_inline(text):
+    """Uses ** for strong and _ for emphasis, as prettier does, leaving code spans alone."""
+    parts = []
+    last = 0
+    for match in _CODE_SPAN.finditer(text):
+        parts.append(_EM.sub(r"_\1_", _STRONG.sub(r"**\1**", text[last:match.start()])))
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(_EM.sub(r"_\1_", _STRONG.sub(r"**\1**", text[last:])))
+    return "".join(parts)
+
+
+def _split_cells(line):
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip() for cell in re.split(r"(?<!\\)\|", line)]
+
+
+def _format_table(rows):
+    """Pads a pipe table's columns to equal width, like prettier."""
+    header, delimiter, body = _split_cells(rows[0]), _split_cells(rows[1]), [_split_cells(row) for row in rows[2:]]
+    columns = len(header)
+    aligns = []
+    for cell in (delimiter + [""] * columns)[:columns]:
+        aligns.append(("c" if cell.endswith(":") else "l") if cell.startswith(":") else ("r" if cell.endswith(":") else ""))
+    cells = [(row + [""] * columns)[:columns] for row in [header] + body]
+    cells = [[_format_inline(cell) for cell in row] for row in cells]
+    widths = [max(3, *(len(row[i]) for row in cells)) for i in range(columns)]
+
+    def line(row):
+        padded = []
+        for i, cell in enumerate(row):
+            if aligns[i] == "r":
+                padded.append(cell.rjust(widths[i]))
+            elif aligns[i] == "c":
+                padded.append(cell.center(widths[i]))
+            else:
+                padded.append(cell.ljust(widths[i]))
+        return "| " + " | ".join(padded) + " |"
+
+    markers = []
+    for i, align in enumerate(aligns):
+        dashes = "-" * widths[i]
+        markers.append({"l": ":" + dashes[1:], "r": dashes[1:] + ":", "c": ":" + dashes[2:] + ":"}.get(align, dashes))
+    return [line(cells[0]), "| " + " | ".join(markers) + " |"] + [line(row) for row in cells[1:]]
+
+
+def format_markdown(text):
+    """Formats Markdown roughly the way prettier does with its defaults (proseWrap: preserve).
+
+    Headings become ATX with one space, bullets use "-", emphasis uses _ and
+    strong **, rules become "---", tables are padded, trailing whitespace and
+    repeated blank lines are removed, and blocks are separated by one blank
+    line. Fenced and indented code and HTML blocks are left untouched.
+    """
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    blocks = []
+    current = []
+
+    def close_block():
+        if current:
+            blocks.append(list(current))
+            current.clear()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        fence = _FENCE.match(line)
+        if fence:
+            close_block()
+            marker = fence.group(2)
+            block = [line.rstrip()]
+            i += 1
+            while i < len(lines):
+                block.append(lines[i])
+                if lines[i].strip().startswith(marker) and set(lines[i].strip()) == {marker[0]}:
+                    block[-1] = lines[i].rstrip()
+                    break
+                i += 1
+            blocks.append(block)
+            i += 1
+            continue
+
+        # Indented code, unless it continues a paragraph or a list item.
+        if (not current and _INDENTED.match(line) and line.strip()
+                and not (blocks and (_LIST_ITEM.match(blocks[-1][0]) or blocks[-1][0].startswith(" ")))):
+            block = []
+            while i < len(lines) and (_INDENTED.match(lines[i]) or not lines[i].strip()):
+                block.append(lines[i])
+                i += 1
+            while not block[-1].strip():
+                block.pop()
+                i -= 1
+            blocks.append(block)
+            continue
+
+        html = _HTML_START.match(line)
+        # Only a block-level start can interrupt a paragraph; a bare tag there is inline HTML.
+        if html and (not current or not html.group("tag")):
+            close_block()
+            if html.group("raw"):
+                end = "</" + html.group("raw").lower()
+            else:
+                end = _HTML_END.get(html.lastgroup)
+            block = []
+            while i < len(lines):
+                if end is None and not lines[i].strip():
+                    break
+                block.append(lines[i])
+                i += 1
+                if end is not None and end in (block[-1].lower() if html.group("raw") else block[-1]):
+                    break
+            blocks.append(block)
+            continue
+
+        stripped = line.rstrip()
+        # Keep Markdown hard breaks (two trailing spaces) but drop other trailing whitespace.
+        if line.endswith("  ") and line.strip() and i + 1 < len(lines) and lines[i + 1].strip():
+            stripped += "  "
+
+        if not stripped.strip():
+            close_block()
+        elif current and _SETEXT.match(stripped) and not _BULLET.match(current[-1]) and "|" not in current[-1]:
+            level = 1 if stripped.strip()[0] == "=" else 2
+            title = " ".join(part.strip() for part in current)
+            current.clear()
+            blocks.append(["#" * level + " " + _format_inline(title)])
+        elif _RULE.match(stripped):
+            close_block()
+            blocks.append(["---"])
+        elif _ATX.match(stripped):
+            close_block()
+            match = _ATX.match(stripped)
+            title = _format_inline((match.group(2) or "").strip())
+            blocks.append([match.group(1) + (" " + title if title else "")])
+        elif (current and len(current) == 1 and "|" in current[0] and _TABLE_DELIMITER.match(stripped)):
+            rows = [current.pop(), stripped]
+            i += 1
+            while i < len(lines) and lines[i].strip() and "|" in lines[i]:
+                rows.append(lines[i])
+                i += 1
+            blocks.append(_format_table(rows))
+            continue
+        else:
+            stripped = _BULLET.sub(r"\1- ", stripped)
+            stripped = _ORDERED.sub(r"\1\2\3 ", stripped)
+            current.append(_format_inline(stripped))
+        i += 1
+    close_block()
+
+    return "\n\n".join("\n".join(block) for block in blocks if block) + "\n"
+
+
+def format_with_python(paths):
+    """Formats Markdown files in place with format_markdown()."""
+    for path in paths:
+        if not path.lower().endswith((".md", ".markdown")):
+            raise FormatterError(f"The Python formatter only supports Markdown files: {path}")
+        with open(path, "r", encoding="utf-8") as file:
+            text = file.read()
+        formatted = format_markdown(text)
+        if formatted != text:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(formatted)
+
+
+# -- prettier backend ----------------------------------------------------------
+
+def prettier_command():
+    """Returns the command that runs prettier: PRETTIER_CMD, a prettier on PATH, or npx prettier."""
+    configured = os.getenv("PRETTIER_CMD")
+    if configured:
+        return configured.split()
+    if shutil.which("prettier"):
+        return ["prettier"]
+    if shutil.which("npx"):
+        return ["npx", "prettier"]
+    return None
+
+
+def format_with_prettier(paths, command=None):
+    """Formats files in place with one prettier invocation."""
+    command = command or prettier_command()
+    if command is None:
+        raise FormatterNotFound("Error: `npx` is not installed or not found in PATH.")
+    try:
+        subprocess.run(command + ["--write", "--"] + list(paths), check=True, timeout=TIMEOUT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise FormatterNotFound("Error: `npx` is not installed or not found in PATH.")
+    except subprocess.CalledProcessError as e:
+        raise FormatterError(f"Error running Prettier: {e.stderr.decode('utf-8', 'replace').strip()}")
+    except subprocess.TimeoutExpired:
+        raise FormatterError("Error running Prettier: timed out.")
+
+
+def resolve_backend(backend=BACKEND):
+    """Returns "prettier" or "python"; "auto" picks prettier when it can be run."""
+    if backend == "auto":
+        return "prettier" if prettier_command() else "python"
+    if backend not in ("prettier", "python"):
+        raise ValueError(f"Unknown formatter backend: {backend}")
+    return backend
+
+
+# -- Service -----------------------------------------------------------------------
+
+class FormattedHashes:
+    """Content hashes of files known to be formatted, persisted between runs."""
+
+    def __init__(self, path, limit=HASH_LIMIT):
+        self.path = path
+        self.limit = limit
+        self.hashes = {}
+        try:
+            with open(path, "r") as file:
+                self.hashes = dict.fromkeys(line.strip() for line in file if line.strip())
+        except OSError:
+            pass
+
+    def __contains__(self, digest):
+        return digest in self.hashes
+
+    def add(self, digests):
+        new = [digest for digest in digests if digest not in self.hashes]
+        if not new:
+            return
+        self.hashes.update(dict.fromkeys(new))
+        if len(self.hashes) > self.limit:
+            # Keep the newest entries and rewrite the file.
+            self.hashes = dict.fromkeys(list(self.hashes)[-self.limit:])
+            with open(self.path, "w") as file:
+                file.write("".join(digest + "\n" for digest in self.hashes))
+        else:
+            with open(self.path, "a") as file:
+                file.write("".join(digest + "\n" for digest in new))
+
+
+class FormatterService:
+    """One long-lived worker thread that formats queued files in batches.
+
+    Everything queued while the previous batch ran (up to `max_batch` files)
+    shares the next formatter invocation; a `batch_window` above zero also
+    waits that many seconds for more. Files whose content hash is already
+    known to be formatted are skipped without running the formatter at all.
+    """
+
+    def __init__(self, backend=BACKEND, batch_window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.backend = resolve_backend(backend)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.command = prettier_command() if self.backend == "prettier" else None
+        self.known = FormattedHashes(cache_path(f"formatted-{self.backend}.txt"))
+        self.stats = {"files": 0, "skipped": 0, "batches": 0, "invocations": 0}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._work, name="formatter", daemon=True)
+        self._thread.start()
+
+    def submit(self, path):
+        """Queues a file and returns a Future resolving to "formatted" or "unchanged"."""
+        future = Future()
+        self._queue.put((os.path.abspath(path), future))
+        return future
+
+    def format(self, path, timeout=None):
+        """Formats a file in place and returns "formatted" or "unchanged"; raises FormatterError."""
+        return self.submit(path).result(timeout)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            waiting = {}
+            for path, future in batch:
+                waiting.setdefault(path, []).append(future)
+            try:
+                self._run_batch(waiting)
+            except Exception as e:  # never let the worker die
+                for futures in waiting.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(FormatterError(str(e)))
+
+    def _run_batch(self, waiting):
+        self.stats["batches"] += 1
+        pending = {}
+        for path, futures in waiting.items():
+            try:
+                with open(path, "rb") as file:
+                    digest = _sha256(file.read())
+            except OSError as e:
+                for future in futures:
+                    future.set_exception(FormatterError(f"Error: File {path} not found." if isinstance(e, FileNotFoundError) else str(e)))
+                continue
+            self.stats["files"] += 1
+            if digest in self.known:
+                self.stats["skipped"] += 1
+                for future in futures:
+                    future.set_result("unchanged")
+            else:
+                pending[path] = (digest, futures)
+        if not pending:
+            return
+
+        try:
+            self._format(list(pending))
+            failed = {}
+        except FormatterNotFound as e:
+            failed = dict.fromkeys(pending, e)
+        except FormatterError:
+            # One bad file fails the whole invocation; retry one by one to find it.
+            failed = {}
+            for path in pending:
+                try:
+                    self._format([path])
+                except FormatterError as e:
+                    failed[path] = e
+
+        formatted = []
+        for path, (digest, futures) in pending.items():
+            if path in failed:
+                for future in futures:
+                    future.set_exception(failed[path])
+                continue
+            with open(path, "rb") as file:
+                new_digest = _sha256(file.read())
+            formatted.append(new_digest)
+            for future in futures:
+                future.set_result("unchanged" if new_digest == digest else "formatted")
+        self.known.add(formatted)
+
+    def _format(self, paths):
+        self.stats["invocations"] += 1
+        if self.backend == "prettier":
+            format_with_prettier(paths, self.command)
+        else:
+            format_with_python(paths)
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_formatter(backend=BACKEND):
+    """Returns the process-wide formatter service for a backend ("prettier", "python" or "auto")."""
+    backend = resolve_backend(backend)
+    # Keyed by pid too: a service inherited across fork() has lost its worker thread.
+    key = (os.getpid(), backend)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = FormatterService(backend)
+    return service
@@ -0,0 +1,98 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_SIZE = (100, 100)
+DEFAULT_QUALITY = 85
+
+
+def has_glob(path):
+    return any(char in path for char in "*?[")
+
+
+def resize_image(input_path, output_path, size=DEFAULT_SIZE, quality=DEFAULT_QUALITY, keep_aspect=True):
+    """Resizes one image and returns the time taken in milliseconds.
+
+    JPEGs are decoded at a reduced scale (Image.draft) when the target is
+    much smaller. With keep_aspect the image is fitted inside `size`
+    (Image.thumbnail); otherwise it is stretched to exactly `size`.
+    """
+    from PIL import Image
+
+    start = time.perf_counter()
+    with Image.open(input_path) as img:
+        if img.format == "JPEG":
+            img.draft("RGB", size)
+        if keep_aspect:
+            img.thumbnail(size, Image.LANCZOS)
+        else:
+            img = img.resize(size, Image.LANCZOS)
+        if output_path.lower().endswith((".jpg", ".jpeg")) and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.save(output_path, optimize=True, quality=quality)
+    return (time.perf_counter() - start) * 1000
+
+
+def _output_path(input_path, output_dir, output_format):
+    name = os.path.basename(input_path)
+    if output_format:
+        name = os.path.splitext(name)[0] + "." + output_format.lstrip(".").lower()
+    return os.path.join(output_dir, name)
+
+
+def _resize_job(job):
+    input_path, output_path, size, quality, keep_aspect = job
+    try:
+        return {"input": input_path, "output": output_path, "status": "resized",
+                "ms": round(resize_image(input_path, output_path, size, quality, keep_aspect), 2)}
+    except Exception as e:
+        return {"input": input_path, "output": output_path, "status": "failed", "error": str(e)}
+
+
+def resize_images(pattern, output_dir, size=DEFAULT_SIZE, quality=DEFAULT_QUALITY, keep_aspect=True,
+                  output_format=None, workers=None, skip_existing=True):
+    """Resizes every image matching a glob pattern into output_dir on a process pool.
+
+    Inputs whose output already exists and is at least as new are skipped.
+    Returns a report with per-image timings and overall throughput.
+    """
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = []
+    jobs = []
+    for input_path in sorted(glob.glob(pattern, recursive=True)):
+        if not os.path.isfile(input_path):
+            continue
+        output_path = _output_path(input_path, output_dir, output_format)
+        if os.path.abspath(output_path) == os.path.abspath(input_path):
+            results.append({"input": input_path, "output": output_path, "status": "failed",
+                            "error": "Output would overwrite the input."})
+            continue
+        if skip_existing:
+            try:
+                if os.path.getmtime(output_path) >= os.path.getmtime(input_path):
+                    results.append({"input": input_path, "output": output_path, "status": "skipped"})
+                    continue
+            except OSError:
+                pass
+        jobs.append((input_path, output_path, tuple(size), quality, keep_aspect))
+
+    if len(jobs) == 1:
+        results.append(_resize_job(jobs[0]))
+    elif jobs:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results.extend(pool.map(_resize_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+    seconds = time.perf_counter() - start
+    resized = sum(1 for result in results if result["status"] == "resized")
+    return {
+        "images": results,
+        "resized": resized,
+        "skipped": sum(1 for result in results if result["status"] == "skipped"),
+        "failed": sum(1 for result in results if result["status"] == "failed"),
+        "seconds": round(seconds, 3),
+        "images_per_second": round(resized / seconds, 2) if seconds else 0.0,
+    }
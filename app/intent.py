@@ -0,0 +1,306 @@
+import os
+import re
+
+# Canonical action strings. Each one is routed by `app.tasks.TASK_RULES`,
+# so they must stay compatible with them.
+ACTIONS = {
+    "A1": "install and run",
+    "A2": "format",
+    "A3": "count",
+    "A4": "sort",
+    "A5": "extract logs",
+    "A6": "extract markdown titles",
+    "A7": "extract email",
+    "A8": "extract credit card",
+    "A9": "find similar",
+    "A10": "calculate sales",
+    "B1": "check data access",
+    "B2": "delete",
+    "B3": "fetch api",
+    "B4": "clone git",
+    "B5": "sql query",
+    "B6": "scrape",
+    "B7": "resize",
+    "B8": "transcribe mp3",
+    "B9": "markdown to html",
+    "B10": "filter csv",
+}
+
+# keyword -> [(task id, weight)]; strong, task-specific keywords weigh 2.
+# Words inside /data paths and URLs count for half, since file names are weaker hints.
+KEYWORDS = {
+    "install": [("A1", 2)], "uv": [("A1", 2)], "datagen": [("A1", 2)],
+    "format": [("A2", 2)], "formatted": [("A2", 2)], "prettier": [("A2", 2)],
+    "count": [("A3", 2)], "how many": [("A3", 1)], "number of": [("A3", 1)],
+    "sort": [("A4", 2)], "sorted": [("A4", 2)], "contacts": [("A4", 2)],
+    "log": [("A5", 2)], "logs": [("A5", 2)], ".log": [("A5", 2)], "recent": [("A5", 1)],
+    "first line": [("A5", 1)],
+    "markdown": [("A6", 1), ("B9", 1)], ".md": [("A6", 1), ("B9", 1)], "h1": [("A6", 2)],
+    "title": [("A6", 2)], "titles": [("A6", 2)], "index": [("A6", 1)],
+    "email": [("A7", 1)], "sender": [("A7", 2)], "sender's": [("A7", 2)],
+    "credit": [("A8", 2)], "card": [("A8", 2)],
+    "similar": [("A9", 2)], "embeddings": [("A9", 2)], "comments": [("A9", 1)],
+    "sales": [("A10", 2)], "total": [("A10", 1)], "ticket": [("A10", 1)],
+    "access": [("B1", 1)], "outside": [("B1", 1)],
+    "delete": [("B2", 2)], "deleted": [("B2", 2)], "remove": [("B2", 1)],
+    "fetch": [("B3", 2)], "api": [("B3", 1)],
+    "clone": [("B4", 2)], "git": [("B4", 2)], "commit": [("B4", 1)],
+    "sql": [("B5", 2)], "sqlite": [("B5", 1)], "duckdb": [("B5", 2)], "query": [("B5", 1)],
+    "select": [("B5", 2)],
+    "scrape": [("B6", 2)], "website": [("B6", 2)],
+    "compress": [("B7", 2)], "resize": [("B7", 2)], "image": [("B7", 1)],
+    "transcribe": [("B8", 2)], "mp3": [("B8", 2)], "audio": [("B8", 1)],
+    "html": [("B9", 2)], "convert": [("B9", 1)],
+    "csv": [("B10", 2)], "filter": [("B10", 2)],
+}
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+_PHRASES = sorted((k for k in KEYWORDS if " " in k), key=len, reverse=True)
+_TOKEN = re.compile(r"[a-z0-9_']+")
+_EXTENSION = re.compile(r"\.[a-z0-9]+\b")
+_DATA_PATH = re.compile(r"/data(?:/[^\s,;'\"`()<>“”]*)?")
+_URL = re.compile(r"https?://[^\s'\"`<>“”]+")
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_WEEKDAY = re.compile(r"\b(" + "|".join(WEEKDAYS) + r")s?\b", re.IGNORECASE)
+_SQL = re.compile(
+    r"SELECT .+?(?=;|\s+(?:on|in|against)\s+/data|\s+and\s+(?:save|write)|$)", re.IGNORECASE
+)
+_RECENT_COUNT = re.compile(r"\b(\d+)\s+(?:most\s+)?(?:recent|latest|newest)\b", re.IGNORECASE)
+_GLOB = re.compile(r"(?<![\w/])(?:\*\*/)?\*?\.([a-z0-9]+)\b", re.IGNORECASE)
+_RECURSIVE = re.compile(r"\b(?:recursive(?:ly)?|subdirector(?:y|ies)|nested)\b", re.IGNORECASE)
+_TOP_K = re.compile(r"\b(?:top\s+(\d+)|(\d+)\s+(?:most\s+similar\s+)?pairs?\b)", re.IGNORECASE)
+_IMAGE_SIZE = re.compile(r"\b(\d+)\s*[x×]\s*(\d+)\b", re.IGNORECASE)
+_QUALITY = re.compile(r"\b(?:quality\s+(?:of\s+)?(\d+)|(\d+)%?\s+quality)\b", re.IGNORECASE)
+_CLAUSE_END = r"(?=\s+(?:and\s+)?(?:save|write|store|output|into|to|in|from)\b|\s*/data|[.;]?\s*$)"
+_SORT_BY = re.compile(r"\bby\s+(.+?)" + _CLAUSE_END, re.IGNORECASE)
+_SORT_ORDER = re.compile(r"\b(?:reversed?|descending|desc|ascending|asc)\b", re.IGNORECASE)
+_SORT_KEY = re.compile(r"(?:the\s+|their\s+)?([a-z][a-z_]*(?:\s+[a-z][a-z_]*)?)$", re.IGNORECASE)
+_WHERE = re.compile(r"\b(?:where|whose)\s+(.+?)" + _CLAUSE_END, re.IGNORECASE)
+_CONDITION = re.compile(
+    r"^(?:the\s+)?[\"'`]?(\w[\w ]*?)[\"'`]?\s+("
+    r"is\s+not|is\s+greater\s+than|is\s+less\s+than|is\s+at\s+least|is\s+at\s+most|is|equals?|"
+    r"greater\s+than|more\s+than|above|over|less\s+than|below|under|at\s+least|at\s+most|"
+    r"contains|starts\s+with|ends\s+with|==|=|!=|>=|<=|>|<"
+    r")\s+(.+)$",
+    re.IGNORECASE,
+)
+_CONDITION_OPS = {
+    "is": "==", "equal": "==", "equals": "==", "=": "==", "==": "==", "is not": "!=", "!=": "!=",
+    "greater than": ">", "is greater than": ">", "more than": ">", "above": ">", "over": ">", ">": ">",
+    "less than": "<", "is less than": "<", "below": "<", "under": "<", "<": "<",
+    "at least": ">=", "is at least": ">=", ">=": ">=", "at most": "<=", "is at most": "<=", "<=": "<=",
+    "contains": "contains", "starts with": "startswith", "ends with": "endswith",
+}
+# Parameter phrases left over after extraction mean the parser missed something
+# the handler would act on, so the task goes to the LLM instead.
+_UNRESOLVED = {
+    "A3": re.compile(r"\d"),
+    "A4": re.compile(r"\bby\b|" + _SORT_ORDER.pattern, re.IGNORECASE),
+    "A5": re.compile(r"\d|\*|(?<![\w/])\.[a-z0-9]+\b", re.IGNORECASE),
+    "A9": re.compile(r"\d"),
+    "B7": re.compile(r"\d"),
+    "B10": re.compile(r"\b(?:where|whose)\b|[<>=]", re.IGNORECASE),
+}
+# Qualifiers no extractor reads, for any task.
+_QUALIFIERS = re.compile(
+    r"\b(?:except|excluding|unless|reversed?|descending|ascending|between|before|after|since|until|ignoring)\b",
+    re.IGNORECASE,
+)
+_TICKET_TYPE = (
+    re.compile(r"ticket\s+type\s+(?:of\s+|is\s+)?[\"“']?(\w+)", re.IGNORECASE),
+    re.compile(r"[\"“'](\w+)[\"”']\s+tickets?\b", re.IGNORECASE),
+    re.compile(r"(\w+)\s+ticket\s+type", re.IGNORECASE),
+)
+
+# Directory-style inputs: the handlers take `os.path.dirname(input_path)`.
+_DIRECTORY_INPUTS = {"A5", "A6"}
+# Tasks that only need one path (or none) use it as both input and output.
+_SINGLE_PATH = {"A1", "A2", "B1", "B2", "B3", "B4", "B6"}
+
+MIN_CONFIDENCE = float(os.getenv("INTENT_MIN_CONFIDENCE", "0.75"))
+
+
+def _score(text, scores, scale=1.0):
+    for phrase in _PHRASES:
+        if phrase in text:
+            for task_id, weight in KEYWORDS[phrase]:
+                scores[task_id] = scores.get(task_id, 0) + weight * scale
+    for token in set(_TOKEN.findall(text)) | set(_EXTENSION.findall(text)):
+        for task_id, weight in KEYWORDS.get(token, ()):
+            scores[task_id] = scores.get(task_id, 0) + weight * scale
+        if token.rstrip("s") in WEEKDAYS:
+            scores["A3"] = scores.get("A3", 0) + 2 * scale
+    return scores
+
+
+def _extract_paths(task_description):
+    return [p.rstrip(".:") for p in _DATA_PATH.findall(task_description)]
+
+
+def extract_sql(task_description):
+    """Returns the SQL query in a task description, without the text that follows it, or None."""
+    match = _SQL.search(task_description or "")
+    return match.group(0).strip() if match else None
+
+
+def _number(text):
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return text
+
+
+def _parse_conditions(clause):
+    """Parses "city equals Paris and age > 30" into filter specs, or returns None."""
+    filters = []
+    for condition in re.split(r"\s+and\s+", clause.strip()):
+        match = _CONDITION.match(condition.strip())
+        if not match:
+            return None
+        op = _CONDITION_OPS[re.sub(r"\s+", " ", match.group(2).lower())]
+        value = match.group(3).strip().rstrip(".,")
+        if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'`":
+            value = value[1:-1]
+        else:
+            value = _number(value)
+        filters.append({"column": match.group(1), "op": op, "value": value})
+    return filters
+
+
+def _parse_sort_keys(clause):
+    """Parses "last_name, then first_name" into ["last_name", "first_name"], or returns None."""
+    keys = []
+    for part in re.split(r"\s*(?:,|\bthen\b|\band\b)\s*(?:by\s+)?", clause.strip()):
+        if not part:
+            continue
+        match = _SORT_KEY.match(part)
+        if not match or _SORT_ORDER.search(part):
+            return None
+        keys.append(re.sub(r"\s+", "_", match.group(1).lower()))
+    return keys or None
+
+
+def parse_intent(task_description):
+    """Extracts structured task info from a description without calling the LLM.
+
+    Returns a (task_info, confidence) tuple; task_info is None when no action matched.
+    """
+    text = (task_description or "").lower()
+    paths = _extract_paths(task_description or "")
+    scores = _score(_DATA_PATH.sub(" ", _URL.sub(" ", text)), {})
+    _score(" ".join(paths + _URL.findall(text)).lower(), scores, scale=0.5)
+    if not scores:
+        return None, 0.0
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    task_id, best = ranked[0]
+    second = ranked[1][1] if len(ranked) > 1 else 0
+    confidence = 0.5 * (best - second) / best + 0.5 * min(best / 4, 1.0)
+
+    parameters = {}
+    # The description without paths, URLs and addresses; each extractor below
+    # blanks out what it consumed so _UNRESOLVED can spot what is left.
+    bare = _EMAIL.sub(" ", _DATA_PATH.sub(" ", _URL.sub(" ", task_description or "")))
+
+    def consume(match):
+        nonlocal bare
+        bare = bare.replace(match.group(0), " ", 1)
+
+    if task_id in ("A1", "B4"):
+        paths = paths or ["/data"]
+
+    if task_id == "A1":
+        email = _EMAIL.search(task_description)
+        if email:
+            parameters["email"] = email.group(0)
+    elif task_id == "A3":
+        day = _WEEKDAY.search(task_description)
+        if not day:
+            confidence = 0.0
+        else:
+            parameters["day"] = day.group(1).lower()
+    elif task_id == "A4":
+        clause = _SORT_BY.search(bare)
+        keys = _parse_sort_keys(clause.group(1)) if clause else None
+        if keys:
+            parameters["sort_keys"] = keys
+            consume(clause)
+    elif task_id == "A5":
+        recent = _RECENT_COUNT.search(bare)
+        if recent:
+            parameters["count"] = int(recent.group(1))
+            consume(recent)
+        extensions = list(_GLOB.finditer(bare))
+        if len(extensions) == 1:
+            parameters["pattern"] = "*." + extensions[0].group(1).lower()
+            consume(extensions[0])
+        if _RECURSIVE.search(bare):
+            parameters["recursive"] = True
+    elif task_id == "A9":
+        top_k = _TOP_K.search(bare)
+        if top_k:
+            parameters["top_k"] = int(top_k.group(1) or top_k.group(2))
+            consume(top_k)
+    elif task_id == "A10":
+        for pattern in _TICKET_TYPE:
+            match = pattern.search(task_description)
+            if match:
+                parameters["ticket_type"] = match.group(1)
+                break
+    elif task_id in ("B3", "B4", "B6"):
+        url = _URL.search(task_description)
+        if not url:
+            confidence = 0.0
+        else:
+            parameters["url"] = url.group(0)
+    elif task_id == "B5":
+        query = extract_sql(task_description)
+        if not query:
+            confidence = 0.0
+        else:
+            parameters["query"] = query
+            bare = bare.replace(query, " ", 1)
+    elif task_id == "B7":
+        size = _IMAGE_SIZE.search(bare)
+        if size:
+            parameters["size"] = f"{size.group(1)}x{size.group(2)}"
+            consume(size)
+        quality = _QUALITY.search(bare)
+        if quality:
+            parameters["quality"] = int(quality.group(1) or quality.group(2))
+            consume(quality)
+    elif task_id == "B10":
+        clause = _WHERE.search(bare)
+        filters = _parse_conditions(clause.group(1)) if clause else None
+        if filters:
+            parameters["filters"] = filters
+            consume(clause)
+
+    if task_id in _UNRESOLVED and _UNRESOLVED[task_id].search(bare) or _QUALIFIERS.search(bare):
+        confidence = min(confidence, 0.5)
+
+    if not paths:
+        return None, 0.0
+    input_path = paths[0]
+    # Prefer the last file-like path as the output; directories are often
+    # mentioned in passing (e.g. "without the /data/docs/ prefix").
+    outputs = [p for p in paths[1:] if os.path.splitext(p)[1]]
+    output_path = outputs[-1] if outputs else paths[-1]
+    if len(paths) == 1 and task_id not in _SINGLE_PATH:
+        # An input and an output are both needed but only one path was given.
+        confidence = min(confidence, 0.5)
+    if task_id in _DIRECTORY_INPUTS and not os.path.splitext(input_path)[1]:
+        input_path = input_path.rstrip("/") + "/"
+
+    task_info = {
+        "action": ACTIONS[task_id],
+        "input_path": input_path,
+        "output_path": output_path,
+        "parameters": parameters,
+    }
+    return task_info, round(confidence, 3)
@@ -0,0 +1,207 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+
+from app.utils import cache_path
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at its configured depth."""
+    pass
+
+
+def _alive(pid):
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobStore:
+    """Job records in SQLite, so any server worker can report on any job."""
+
+    def __init__(self, db_path, max_finished=10000):
+        self.db_path = db_path
+        self.max_finished = max_finished
+        self._lock = threading.Lock()
+        self._conn = None
+        self._saved = 0
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, data TEXT NOT NULL, pid INTEGER NOT NULL, finished REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished)")
+            self._conn.commit()
+        return self._conn
+
+    def save(self, job):
+        """Stores the current state of a job, pruning the oldest finished jobs now and then."""
+        with self._lock:
+            conn = self._db()
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, data, pid, finished) VALUES (?, ?, ?, ?)",
+                (job["id"], json.dumps(job, default=str), os.getpid(), job.get("finished")),
+            )
+            self._saved += 1
+            if self._saved % 100 == 0:
+                conn.execute(
+                    "DELETE FROM jobs WHERE finished IS NOT NULL AND id NOT IN "
+                    "(SELECT id FROM jobs WHERE finished IS NOT NULL ORDER BY finished DESC LIMIT ?)",
+                    (self.max_finished,),
+                )
+            conn.commit()
+
+    def get(self, job_id):
+        """Returns a job, or None if it is unknown."""
+        with self._lock:
+            row = self._db().execute("SELECT data, pid FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = json.loads(row[0])
+        if "finished" not in job and row[1] != os.getpid() and not _alive(row[1]):
+            job.update(status="failed", error="The server worker running this job exited.")
+        return job
+
+
+def _run_job(task):
+    # Module-level so it can be pickled for the process pool.
+    from app.tasks import execute_task
+
+    meta = {}
+    result = execute_task(task, meta)
+    return result, meta
+
+
+class JobQueue:
+    """Bounded queue of /run tasks executed by a thread or process worker pool.
+
+    Each dispatcher owns one single-worker executor and only hands it a job
+    when the previous one is finished, so the timeout starts when the job
+    does and at most `max_depth` jobs wait behind the running ones. A
+    timed-out process worker is killed and replaced; a thread cannot be
+    interrupted, so its slot stays taken until the job finishes in the
+    background. Jobs are recorded in a JobStore, so with several server
+    workers any of them can answer /jobs/<id>; the depth bound applies to
+    each worker process.
+    """
+
+    def __init__(self, workers=4, max_depth=100, timeout=300.0, mode="thread", max_finished=10000, store=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.mode = mode
+        self._queue = queue.Queue()
+        # One slot per queued or running job, released when its worker is free again.
+        self._slots = threading.BoundedSemaphore(max_depth + workers)
+        self._store = store or JobStore(cache_path("jobs.db"), max_finished=max_finished)
+        self._lock = threading.Lock()
+        self._started = False
+
+    def _start(self):
+        for i in range(self.workers):
+            threading.Thread(target=self._dispatch, name=f"job-dispatch-{i}", daemon=True).start()
+        self._started = True
+
+    def _new_executor(self):
+        if self.mode == "process":
+            return ProcessPoolExecutor(max_workers=1)
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="job")
+
+    def submit(self, task):
+        """Queues a task and returns its job id; raises QueueFullError when full."""
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "task": task,
+            "submitted": time.time(),
+        }
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError("Job queue is full, retry later.")
+        with self._lock:
+            if not self._started:
+                self._start()
+        try:
+            self._store.save(job)
+        except sqlite3.Error:
+            self._slots.release()
+            raise
+        self._queue.put(job)
+        return job["id"]
+
+    def get(self, job_id):
+        """Returns a snapshot of a job, or None if it is unknown."""
+        return self._store.get(job_id)
+
+    def depth(self):
+        """Returns the number of jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    def _dispatch(self):
+        executor = self._new_executor()
+        while True:
+            job = self._queue.get()
+            job.update(status="running", started=time.time())
+            self._store.save(job)
+            future = None
+            try:
+                future = executor.submit(_run_job, job["task"])
+                result, meta = future.result(timeout=self.timeout)
+                update = {"status": "done", "result": result, **meta}
+            except FutureTimeoutError:
+                update = {"status": "timeout", "error": f"Job exceeded {self.timeout:g}s timeout."}
+            except Exception as e:
+                update = {"status": "failed", "error": str(e)}
+            job.update(update, finished=time.time())
+            self._store.save(job)
+
+            if future is not None and not future.done():
+                if self.mode == "process":
+                    executor = self._recycle(executor)
+                else:
+                    wait([future])
+            elif self.mode == "process" and update["status"] == "failed" and getattr(executor, "_broken", False):
+                executor = self._recycle(executor)
+            self._slots.release()
+
+    def _recycle(self, executor):
+        """Kills a process worker that is stuck on a job and returns a fresh executor."""
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+        return self._new_executor()
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Returns the process-wide job queue configured from the environment."""
+    global _job_queue
+    # A queue inherited across fork() has lost its dispatcher threads.
+    if _job_queue is None or _job_queue[0] != os.getpid():
+        with _job_queue_lock:
+            if _job_queue is None or _job_queue[0] != os.getpid():
+                _job_queue = os.getpid(), JobQueue(
+                    workers=int(os.getenv("JOB_WORKERS", "4")),
+                    max_depth=int(os.getenv("JOB_QUEUE_DEPTH", "100")),
+                    timeout=float(os.getenv("JOB_TIMEOUT", "300")),
+                    mode=os.getenv("JOB_POOL", "thread"),
+                )
+    return _job_queue[1]
@@ -0,0 +1,175 @@
+import os
+import random
+import threading
+import time
+
+from app.metrics import timed
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Rough size of a token for English text; close enough for budgeting prompts.
+CHARS_PER_TOKEN = 4
+PROMPT_BUDGET = int(os.getenv("LLM_PROMPT_BUDGET", "2000"))
+
+
+class LLMError(Exception):
+    """Raised when the LLM endpoint fails after all retries."""
+    pass
+
+
+class _InFlight:
+    """A request that concurrent callers with the same prompt wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class LLMClient:
+    """Long-lived client for an OpenAI-compatible API with pooled connections.
+
+    Concurrent calls with an identical prompt share a single HTTP request.
+    """
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, model="gpt-4o-mini",
+                 timeout=30.0, max_retries=4, backoff=0.5, max_backoff=20.0, pool_size=16):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        # requests is imported here rather than at module level to keep startup fast.
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    @timed("llm")
+    def complete(self, prompt, max_tokens=100):
+        """Returns the model's reply to a prompt."""
+        key = (prompt, max_tokens)
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InFlight()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._complete(prompt, max_tokens)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+
+    def _complete(self, prompt, max_tokens):
+        data = self.post("/chat/completions", {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+        })
+        try:
+            choice = data["choices"][0]
+            text = choice["message"]["content"] if "message" in choice else choice["text"]
+        except (KeyError, IndexError, TypeError):
+            raise LLMError("Unexpected response format from LLM.")
+        return (text or "").strip()
+
+    @timed("llm")
+    def embed(self, texts, model="text-embedding-3-small"):
+        """Returns one embedding vector per text, in order."""
+        data = self.post("/embeddings", {"model": model, "input": list(texts)})
+        try:
+            return [item["embedding"] for item in sorted(data["data"], key=lambda item: item["index"])]
+        except (KeyError, TypeError):
+            raise LLMError("Unexpected response format from embeddings endpoint.")
+
+    def post(self, path, payload):
+        """POSTs JSON to the API, retrying 429/5xx and network errors with jittered backoff."""
+        import requests
+
+        url = self.base_url + path
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.json()
+                error = LLMError(f"HTTP {response.status_code} from {url}")
+                retry_after = response.headers.get("Retry-After")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = LLMError(str(e))
+            except (requests.RequestException, ValueError) as e:
+                raise LLMError(str(e))
+
+            if attempt == self.max_retries:
+                raise error
+            time.sleep(self._delay(attempt, retry_after))
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        ceiling = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+
+def fit_to_budget(text, max_tokens=PROMPT_BUDGET):
+    """Trims text to about `max_tokens` tokens, cutting at a line break where possible."""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut if cut > limit // 2 else limit]
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Returns the process-wide LLM client, configuring it from the environment once."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from dotenv import load_dotenv
+
+                load_dotenv()
+                base_url = os.getenv("LLM_BASE_URL", DEFAULT_BASE_URL)
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key and base_url == DEFAULT_BASE_URL:
+                    raise ValueError("API Key is missing! Check your .env file or environment variables.")
+                _client = LLMClient(
+                    api_key,
+                    base_url=base_url,
+                    model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+                    timeout=float(os.getenv("LLM_TIMEOUT", "30")),
+                    max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+                    pool_size=int(os.getenv("LLM_POOL_SIZE", "16")),
+                )
+    return _client
@@ -0,0 +1,50 @@
+import fnmatch
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+FIRST_LINE_LIMIT = 4096
+READ_WORKERS = int(os.getenv("LOGSCAN_WORKERS", "16"))
+
+
+def scan_stats(directory, pattern="*.log", recursive=False):
+    """Yields (stat_result, path) for files matching `pattern`, stat-ing each entry once."""
+    pending = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                    elif fnmatch.fnmatch(entry.name, pattern):
+                        yield entry.stat(), entry.path
+                except OSError:
+                    # The file vanished or is unreadable; skip it.
+                    continue
+
+
+def scan_files(directory, pattern="*.log", recursive=False):
+    """Yields (mtime, path) for files matching `pattern`."""
+    for stat, path in scan_stats(directory, pattern, recursive):
+        yield stat.st_mtime, path
+
+
+def most_recent(directory, count=10, pattern="*.log", recursive=False):
+    """Returns the paths of the `count` most recently modified matching files, newest first."""
+    return [path for _, path in heapq.nlargest(count, scan_files(directory, pattern, recursive))]
+
+
+def read_first_line(path, limit=FIRST_LINE_LIMIT):
+    """Returns the first line of a file, reading at most `limit` characters."""
+    with open(path, "r", errors="replace") as file:
+        return file.readline(limit)
+
+
+def recent_first_lines(directory, count=10, pattern="*.log", recursive=False):
+    """Returns the first lines of the `count` most recent matching files, newest first."""
+    paths = most_recent(directory, count, pattern, recursive)
+    if len(paths) <= 1:
+        return [read_first_line(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(paths))) as pool:
+        return list(pool.map(read_first_line, paths))
@@ -0,0 +1,332 @@
+import html
+import re
+
+_ATX_HEADING = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_SETEXT = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+_RULE = re.compile(r"^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+_FENCE = re.compile(r"^( {0,3})(`{3,}|~{3,})[ \t]*([^`\s]*)")
+_QUOTE = re.compile(r"^ {0,3}> ?(.*)$")
+_LIST_ITEM = re.compile(r"^( *)([-*+]|\d{1,9}[.)])(?:[ \t]+(.*)|[ \t]*$)")
+_HTML_BLOCK = re.compile(r"^ {0,3}<(?:[A-Za-z][\w-]*[\s/>]|[A-Za-z][\w-]*$|/[A-Za-z]|!--)")
+_TABLE_DELIMITER = re.compile(r"^ *\|? *:?-+:? *(?:\| *:?-+:? *)*\|? *$")
+
+_CODE_SPAN = re.compile(r"(`+)(.+?)(?<!`)\1(?!`)", re.DOTALL)
+_ESCAPE = re.compile(r"\\([\\`*_{}\[\]()#+\-.!<>~|\"'])")
+_RAW_TAG = re.compile(r"<!--.*?-->|</?[A-Za-z][\w-]*(?:\s+[^<>]*?)?/?>", re.DOTALL)
+_AUTOLINK = re.compile(r"<((?:https?|ftp|mailto):[^\s<>]+)>")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\(\s*<?([^)\s>]*)>?(?:\s+\"([^\"]*)\")?\s*\)")
+_LINK = re.compile(r"\[((?:[^\[\]]|\[[^\]]*\])+)\]\(\s*<?([^)\s>]*)>?(?:\s+\"([^\"]*)\")?\s*\)")
+_EMPHASIS = (
+    (re.compile(r"\*\*(?=\S)(.+?)(?<=\S)\*\*", re.DOTALL), r"<strong>\1</strong>"),
+    (re.compile(r"(?<![\w_])__(?=\S)(.+?)(?<=\S)__(?![\w_])", re.DOTALL), r"<strong>\1</strong>"),
+    (re.compile(r"\*(?=[^\s*])(.+?)(?<=[^\s*])\*", re.DOTALL), r"<em>\1</em>"),
+    (re.compile(r"(?<![\w_])_(?=\S)(.+?)(?<=\S)_(?![\w_])", re.DOTALL), r"<em>\1</em>"),
+    (re.compile(r"~~(?=\S)(.+?)(?<=\S)~~", re.DOTALL), r"<del>\1</del>"),
+)
+_HARD_BREAK = re.compile(r"(?: {2,}|\\)\n")
+_PLACEHOLDER = re.compile("\x00(\\d+)\x00")
+
+
+def _attribute(value):
+    return html.escape(value, quote=True)
+
+
+def render_inline(text):
+    """Renders inline Markdown (code, links, images, emphasis, breaks) to HTML."""
+    stash = []
+
+    def keep(fragment):
+        stash.append(fragment)
+        return f"\x00{len(stash) - 1}\x00"
+
+    def link(match, image=False):
+        label, url, title = match.groups()
+        title_attr = f' title="{_attribute(title)}"' if title else ""
+        if image:
+            return keep(f'<img src="{_attribute(url)}" alt="{_attribute(label)}"{title_attr} />')
+        return keep(f'<a href="{_attribute(url)}"{title_attr}>{render_inline(label)}</a>')
+
+    text = _CODE_SPAN.sub(lambda m: keep(f"<code>{html.escape(m.group(2).strip(), quote=False)}</code>"), text)
+    text = _ESCAPE.sub(lambda m: keep(html.escape(m.group(1), quote=False)), text)
+    text = _AUTOLINK.sub(lambda m: keep(f'<a href="{_attribute(m.group(1))}">{html.escape(m.group(1))}</a>'), text)
+    text = _IMAGE.sub(lambda m: link(m, image=True), text)
+    text = _LINK.sub(link, text)
+    text = _RAW_TAG.sub(lambda m: keep(m.group(0)), text)
+
+    text = html.escape(text, quote=False)
+    for pattern, replacement in _EMPHASIS:
+        text = pattern.sub(replacement, text)
+    text = _HARD_BREAK.sub("<br />\n", text)
+
+    # Placeholders can nest (e.g. code inside a link label), so expand until none are left.
+    while _PLACEHOLDER.search(text):
+        text = _PLACEHOLDER.sub(lambda m: stash[int(m.group(1))], text)
+    return text
+
+
+def _split_row(line):
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in re.split(r"(?<!\\)\|", line)]
+
+
+class MarkdownRenderer:
+    """Line-at-a-time Markdown to HTML renderer.
+
+    Lines go in through feed() and HTML is passed to `write` as soon as each
+    block is complete, so memory stays bounded by the largest paragraph rather
+    than the document. Covers headings, paragraphs, emphasis, code spans and
+    fenced/indented code, block quotes, nested lists, tables, rules, links,
+    images and raw HTML. Reference-style links are not resolved.
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self.paragraph = []
+        self.fence = None
+        self.code = False
+        self.pending_blanks = 0
+        self.lists = []
+        self.quote = None
+        self.table = None
+        self.html_block = False
+        self.blank = True
+
+    def feed(self, line):
+        line = line.rstrip("\r\n").expandtabs(4)
+
+        if self.fence is not None:
+            indent, marker = self.fence
+            if line.strip().startswith(marker) and set(line.strip()) == {marker[0]}:
+                self.write("</code></pre>\n")
+                self.fence = None
+            else:
+                self.write(html.escape(line[min(indent, len(line) - len(line.lstrip(" "))):], quote=False) + "\n")
+            return
+
+        if self.html_block:
+            if line.strip():
+                self.write(line + "\n")
+                return
+            self.html_block = False
+
+        if self.code:
+            if line.startswith("    ") or not line.strip():
+                if not line.strip():
+                    self.pending_blanks += 1
+                    return
+                self.write("\n" * self.pending_blanks + html.escape(line[4:], quote=False) + "\n")
+                self.pending_blanks = 0
+                return
+            self.write("</code></pre>\n")
+            self.code = False
+            self.pending_blanks = 0
+
+        if self.quote is not None:
+            match = _QUOTE.match(line)
+            if match:
+                self.quote.feed(match.group(1))
+                return
+            if line.strip() and self.quote.paragraph and not self._starts_block(line):
+                self.quote.feed(line)
+                return
+            self.quote.close()
+            self.write("</blockquote>\n")
+            self.quote = None
+
+        if self.table is not None:
+            if line.strip() and "|" in line:
+                self._table_row(_split_row(line), "td")
+                return
+            self.write("</tbody></table>\n")
+            self.table = None
+
+        self._block(line)
+
+    def _starts_block(self, line):
+        return bool(_ATX_HEADING.match(line) or _RULE.match(line) or _FENCE.match(line)
+                    or _LIST_ITEM.match(line) or _QUOTE.match(line))
+
+    def _block(self, line):
+        stripped = line.strip()
+        blank_before = self.blank
+        self.blank = not stripped
+        if not stripped:
+            self._flush_paragraph()
+            return
+
+        if self.paragraph and not self.lists:
+            match = _SETEXT.match(line)
+            if match:
+                level = 1 if match.group(1)[0] == "=" else 2
+                text = "\n".join(self.paragraph)
+                self.paragraph = []
+                self.write(f"<h{level}>{render_inline(text)}</h{level}>\n")
+                return
+            if len(self.paragraph) == 1 and "|" in self.paragraph[0] and _TABLE_DELIMITER.match(line):
+                self._open_table(self.paragraph.pop(), line)
+                return
+
+        if line.startswith("    ") and not self.paragraph and not self.lists:
+            self.write("<pre><code>" + html.escape(line[4:], quote=False) + "\n")
+            self.code = True
+            return
+
+        if _RULE.match(line):
+            self._close_blocks()
+            self.write("<hr />\n")
+            return
+
+        match = _ATX_HEADING.match(line)
+        if match:
+            self._close_blocks()
+            level = len(match.group(1))
+            self.write(f"<h{level}>{render_inline(match.group(2) or '')}</h{level}>\n")
+            return
+
+        match = _FENCE.match(line)
+        if match:
+            self._close_blocks()
+            indent, marker, language = match.groups()
+            self.fence = (len(indent), marker)
+            language = f' class="language-{_attribute(language)}"' if language else ""
+            self.write(f"<pre><code{language}>")
+            return
+
+        match = _QUOTE.match(line)
+        if match:
+            self._close_blocks()
+            self.write("<blockquote>\n")
+            self.quote = MarkdownRenderer(self.write)
+            self.quote.feed(match.group(1))
+            return
+
+        match = _LIST_ITEM.match(line)
+        if match and (self.lists or not self.paragraph or match.group(3)):
+            self._list_item(len(match.group(1)), match.group(2), match.group(3) or "")
+            return
+
+        if self.lists:
+            if blank_before and not self.paragraph:
+                # Text after a blank line stays in the item only if indented under it.
+                if len(line) - len(line.lstrip(" ")) >= self.lists[-1][2]:
+                    self._flush_paragraph()
+                    self.write("\n")
+                    self.paragraph.append(stripped)
+                    return
+                self._close_lists(0)
+            else:
+                self.paragraph.append(line.lstrip())
+                return
+
+        if _HTML_BLOCK.match(line) and not self.paragraph:
+            self.write(line + "\n")
+            self.html_block = True
+            return
+
+        self.paragraph.append(line.lstrip())
+
+    def _flush_paragraph(self):
+        if not self.paragraph:
+            return
+        text = render_inline("\n".join(self.paragraph))
+        self.paragraph = []
+        if self.lists:
+            self.write(text)
+        else:
+            self.write(f"<p>{text}</p>\n")
+
+    def _close_blocks(self):
+        self._flush_paragraph()
+        self._close_lists(0)
+
+    def _list_item(self, indent, marker, text):
+        self._flush_paragraph()
+        tag = "ul" if marker in "-*+" else "ol"
+        content_indent = indent + len(marker) + 1
+
+        # Close lists nested deeper than this item.
+        while self.lists and indent < self.lists[-1][1]:
+            self._close_lists(len(self.lists) - 1)
+
+        if self.lists and indent >= self.lists[-1][2]:
+            self.write("\n")
+        elif self.lists and self.lists[-1][0] == tag:
+            self.write("</li>\n")
+            self.lists[-1] = (tag, self.lists[-1][1], content_indent)
+            self.write("<li>")
+            self.paragraph.append(text)
+            return
+        elif self.lists:
+            self._close_lists(len(self.lists) - 1)
+
+        start = ""
+        if tag == "ol":
+            number = int(marker[:-1])
+            if number != 1:
+                start = f' start="{number}"'
+        self.write(f"<{tag}{start}>\n<li>")
+        self.lists.append((tag, indent, content_indent))
+        if text:
+            self.paragraph.append(text)
+
+    def _close_lists(self, depth):
+        self._flush_paragraph()
+        while len(self.lists) > depth:
+            tag = self.lists.pop()[0]
+            self.write(f"</li>\n</{tag}>\n")
+
+    def _open_table(self, header, delimiter):
+        self.table = []
+        for cell in _split_row(delimiter):
+            left, right = cell.startswith(":"), cell.endswith(":")
+            self.table.append("center" if left and right else "right" if right else "left" if left else None)
+        self.write("<table>\n<thead>\n")
+        self._table_row(_split_row(header), "th")
+        self.write("</thead>\n<tbody>\n")
+
+    def _table_row(self, cells, tag):
+        row = []
+        for i, align in enumerate(self.table):
+            cell = render_inline(cells[i]) if i < len(cells) else ""
+            style = f' style="text-align: {align}"' if align else ""
+            row.append(f"<{tag}{style}>{cell}</{tag}>")
+        self.write("<tr>" + "".join(row) + "</tr>\n")
+
+    def close(self):
+        """Flushes and closes any open blocks."""
+        if self.fence is not None or self.code:
+            self.write("</code></pre>\n")
+            self.fence = None
+            self.code = False
+        self.html_block = False
+        if self.quote is not None:
+            self.quote.close()
+            self.write("</blockquote>\n")
+            self.quote = None
+        if self.table is not None:
+            self.write("</tbody></table>\n")
+            self.table = None
+        self._close_blocks()
+
+
+def markdown_to_html(text):
+    """Renders a Markdown string to an HTML fragment."""
+    parts = []
+    renderer = MarkdownRenderer(parts.append)
+    for line in text.splitlines():
+        renderer.feed(line)
+    renderer.close()
+    return "".join(parts)
+
+
+def convert_file(input_path, output_path):
+    """Renders a Markdown file to an HTML file, one line at a time."""
+    with open(input_path, "r", encoding="utf-8") as source, open(output_path, "w", encoding="utf-8") as target:
+        renderer = MarkdownRenderer(target.write)
+        for line in source:
+            renderer.feed(line)
+        renderer.close()
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+from app.metrics import registry
+from app.utils import cache_path, flag
+
+# Tasks whose output depends only on their input files and parameters.
+MEMOIZABLE = {"A3", "A4", "A5", "A6", "A10", "B10"}
+# Tasks that read the directory holding input_path rather than the file itself.
+DIRECTORY_INPUTS = {"A5", "A6"}
+# Bump when a memoized handler changes its output format.
+VERSION = 1
+
+ENABLED = os.getenv("MEMO_ENABLED", "1") != "0"
+MAX_BYTES = int(float(os.getenv("MEMO_MAX_MB", "256")) * 1024 * 1024)
+CONTENT_HASH = os.getenv("MEMO_CONTENT_HASH", "0") == "1"
+
+
+def _hash_file(path, digest):
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+
+def _file_state(path, digest, content_hash):
+    if content_hash:
+        _hash_file(path, digest)
+    else:
+        stat = os.stat(path)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}\0".encode())
+
+
+def fingerprint(path, content_hash=False):
+    """Returns a hex digest identifying the current state of a file.
+
+    By default it covers the file's size and mtime; with content_hash the
+    contents are hashed instead, so touched but unchanged files still match.
+    A SQLite -wal file next to it is included too, since WAL-mode writes
+    leave the database file itself untouched until a checkpoint. Raises
+    OSError if the path cannot be read.
+    """
+    digest = hashlib.sha256()
+    if not content_hash:
+        digest.update(os.path.realpath(path).encode() + b"\0")
+    _file_state(path, digest, content_hash)
+    wal_path = path + "-wal"
+    if os.path.exists(wal_path):
+        digest.update(b"-wal\0")
+        _file_state(wal_path, digest, content_hash)
+    return digest.hexdigest()
+
+
+def directory_fingerprint(kind, directory, parameters, exclude=None, content_hash=False):
+    """Returns a hex digest of the files the A5 or A6 handler would scan in `directory`.
+
+    It runs the handler's own scan, with its pattern and recursive settings.
+    A5 orders logs by mtime, so it always covers (size, mtime) even with
+    content_hash, and never reads the logs. `exclude` is skipped, e.g. an
+    output written inside the directory.
+    """
+    if kind == "A5":
+        from app.logscan import scan_stats
+
+        found = {
+            os.path.relpath(path, directory): (stat.st_mtime_ns, stat.st_size)
+            for stat, path in scan_stats(
+                directory, parameters.get("pattern", "*.log"), flag(parameters.get("recursive"))
+            )
+        }
+        content_hash = False
+    else:
+        from app.titles import scan_markdown
+
+        found = scan_markdown(directory, recursive=flag(parameters.get("recursive"), True))
+    excluded = os.path.relpath(os.path.abspath(exclude), os.path.abspath(directory)) if exclude else None
+
+    digest = hashlib.sha256()
+    if not content_hash:
+        digest.update(os.path.realpath(directory).encode() + b"\0")
+    for relative in sorted(found):
+        if relative == excluded:
+            continue
+        digest.update(relative.encode() + b"\0")
+        if content_hash:
+            _hash_file(os.path.join(directory, relative), digest)
+        else:
+            mtime, size = found[relative]
+            digest.update(f"{size}:{mtime}\0".encode())
+    return digest.hexdigest()
+
+
+def memo_key(kind, input_path, output_path, parameters):
+    """Returns the result key for a task run, or None if it can't be memoized."""
+    if kind not in MEMOIZABLE:
+        return None
+    content_hash = flag(parameters.get("content_hash"), CONTENT_HASH)
+    try:
+        if kind in DIRECTORY_INPUTS:
+            directory = os.path.dirname(input_path)
+            state = directory_fingerprint(kind, directory, parameters, exclude=output_path, content_hash=content_hash)
+        else:
+            state = fingerprint(input_path, content_hash=content_hash)
+        params = json.dumps(parameters, sort_keys=True, default=str)
+    except (OSError, TypeError, ValueError):
+        return None
+    return hashlib.sha256(f"{VERSION}\0{kind}\0{params}\0{state}".encode()).hexdigest()
+
+
+class ResultStore:
+    """Task outputs stored on disk by key, with an LRU bound on total size."""
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.directory, "index.db"), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, message TEXT NOT NULL, size INTEGER NOT NULL, "
+                "last_access REAL NOT NULL, output_path TEXT, output_size INTEGER, output_mtime INTEGER)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _blob(self, key):
+        return os.path.join(self.directory, key + ".out")
+
+    def restore(self, key, output_path):
+        """Writes the stored output for `key` to output_path and returns its message, or None."""
+        with self._lock:
+            conn = self._db()
+            row = conn.execute(
+                "SELECT message, output_path, output_size, output_mtime FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                registry.inc("agent_cache_lookups_total", cache="results", result="miss")
+                return None
+            message, last_path, last_size, last_mtime = row
+            try:
+                stat = os.stat(output_path) if output_path == last_path and os.path.exists(output_path) else None
+                # The output from the last run or restore is still in place.
+                if stat is None or (stat.st_size, stat.st_mtime_ns) != (last_size, last_mtime):
+                    shutil.copyfile(self._blob(key), output_path)
+                    stat = os.stat(output_path)
+            except OSError:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                conn.commit()
+                registry.inc("agent_cache_lookups_total", cache="results", result="miss")
+                return None
+            conn.execute(
+                "UPDATE results SET last_access = ?, output_path = ?, output_size = ?, output_mtime = ? "
+                "WHERE key = ?",
+                (time.time(), output_path, stat.st_size, stat.st_mtime_ns, key),
+            )
+            conn.commit()
+            registry.inc("agent_cache_lookups_total", cache="results", result="hit")
+            return message
+
+    def save(self, key, output_path, message):
+        """Stores a copy of output_path under `key`, evicting old entries to stay in budget."""
+        try:
+            stat = os.stat(output_path)
+        except OSError:
+            return
+        if not os.path.isfile(output_path) or stat.st_size > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._db()
+            blob = self._blob(key)
+            tmp_path = f"{blob}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                shutil.copyfile(output_path, tmp_path)
+                os.replace(tmp_path, blob)
+            except OSError:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO results "
+                "(key, message, size, last_access, output_path, output_size, output_mtime) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, message, stat.st_size, time.time(), output_path, stat.st_size, stat.st_mtime_ns),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_access").fetchall():
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            try:
+                os.remove(self._blob(key))
+            except OSError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                return
+
+    def stats(self):
+        """Returns hit/miss counters (summed over every server worker) and disk usage for the store."""
+        hits = registry.value("agent_cache_lookups_total", cache="results", result="hit")
+        misses = registry.value("agent_cache_lookups_total", cache="results", result="miss")
+        with self._lock:
+            entries, size = self._db().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+result_store = ResultStore(cache_path("results"))
@@ -0,0 +1,283 @@
+import atexit
+import bisect
+import cProfile
+import functools
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds; an implicit +Inf bucket follows.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "1000"))
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+# How often each process writes its metrics to METRICS_DIR (see Registry).
+FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "1"))
+
+_local = threading.local()
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class Registry:
+    """Histograms and counters keyed by metric name and label values.
+
+    When METRICS_DIR is set (run.py --prod does so for several workers), each
+    process writes its metrics there every FLUSH_SECONDS, and render() and
+    value() add up every process's file, so any worker can answer a scrape.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.help = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flusher_pid = None
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+            self._changed()
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+            self._changed()
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def _changed(self):
+        self._dirty = True
+        # Started per process, since a flusher thread does not survive fork().
+        if self._flusher_pid != os.getpid() and os.getenv("METRICS_DIR"):
+            self._flusher_pid = os.getpid()
+            threading.Thread(target=self._flush_periodically, name="metrics-flush", daemon=True).start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(FLUSH_SECONDS)
+            self.flush()
+
+    def _snapshot(self):
+        with self._lock:
+            return (
+                dict(self.counters),
+                {key: (list(h.counts), h.sum, h.count) for key, h in self.histograms.items()},
+            )
+
+    def flush(self):
+        """Writes this process's metrics to METRICS_DIR, if set, for the other workers to read."""
+        directory = os.getenv("METRICS_DIR")
+        if not directory or not self._dirty:
+            return
+        self._dirty = False
+        counters, histograms = self._snapshot()
+        data = {
+            "counters": [[name, labels, value] for (name, labels), value in counters.items()],
+            "histograms": [[name, labels, *state] for (name, labels), state in histograms.items()],
+        }
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"metrics-{os.getpid()}.json")
+        with open(path + ".tmp", "w") as file:
+            json.dump(data, file)
+        os.replace(path + ".tmp", path)
+
+    def _collect(self):
+        """Returns (counters, histograms) for this process plus every other one in METRICS_DIR."""
+        counters, histograms = self._snapshot()
+        directory = os.getenv("METRICS_DIR")
+        if not directory or not os.path.isdir(directory):
+            return counters, histograms
+        own = f"metrics-{os.getpid()}.json"
+        for entry in os.scandir(directory):
+            if not entry.name.startswith("metrics-") or not entry.name.endswith(".json") or entry.name == own:
+                continue
+            try:
+                with open(entry.path) as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in data["counters"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, counts, total, count in data["histograms"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                mine = histograms.get(key, ([0] * len(counts), 0.0, 0))
+                histograms[key] = ([a + b for a, b in zip(mine[0], counts)], mine[1] + total, mine[2] + count)
+        return counters, histograms
+
+    def value(self, name, **labels):
+        """Returns a counter's current value, summed over every worker."""
+        counters, _ = self._collect()
+        return counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format."""
+        counters, histograms = self._collect()
+
+        lines = []
+        for name in sorted({name for name, _ in counters}):
+            lines += [f"# HELP {name} {self.help.get(name, name)}", f"# TYPE {name} counter"]
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+
+        for name in sorted({name for name, _ in histograms}):
+            lines += [f"# HELP {name} {self.help.get(name, name)}", f"# TYPE {name} histogram"]
+            for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket in zip(BUCKETS + ("+Inf",), counts):
+                    cumulative += bucket
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+registry = Registry()
+registry.describe("agent_stage_seconds", "Time spent in each stage of a task, by action.")
+registry.describe("agent_tasks_total", "Tasks run, by action and outcome (ok, error or memoized).")
+registry.describe("agent_http_request_seconds", "HTTP request latency, by route and status.")
+registry.describe("agent_cache_lookups_total", "Cache lookups, by cache (interpretations or results) and result.")
+atexit.register(registry.flush)
+
+
+def current_action():
+    return getattr(_local, "action", None) or "unknown"
+
+
+@contextmanager
+def action_scope(action):
+    """Attributes the spans recorded in this thread to `action` (a task id such as "A3")."""
+    previous = getattr(_local, "action", None)
+    _local.action = action
+    try:
+        yield
+    finally:
+        _local.action = previous
+
+
+def record(stage, seconds, action=None):
+    """Records a finished span in the histograms and in this thread's trace, if any."""
+    registry.observe("agent_stage_seconds", seconds, action=action or current_action(), stage=stage)
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace[stage] = round(trace.get(stage, 0.0) + seconds * 1000, 3)
+
+
+@contextmanager
+def span(stage):
+    """Times the enclosed block as one stage (e.g. "io", "llm", "subprocess") of the current task."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def timed(stage):
+    """Decorator form of span()."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def trace():
+    """Collects the milliseconds spent per stage in this thread into the yielded dict."""
+    previous = getattr(_local, "trace", None)
+    _local.trace = {}
+    try:
+        yield _local.trace
+    finally:
+        _local.trace = previous
+
+
+def _prune_profiles(directory):
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(".prof")),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in profiles[:-PROFILE_KEEP] if PROFILE_KEEP else []:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+@contextmanager
+def maybe_profile(label):
+    """Profiles a sampled fraction (PROFILE_SAMPLE_RATE) of calls with cProfile.
+
+    Profiles of calls slower than PROFILE_SLOW_MS are dumped as .prof files to
+    PROFILE_DIR (default <CACHE_DIR>/profiles), keeping the newest PROFILE_KEEP.
+    Off by default.
+    """
+    if PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE:
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already active in this thread.
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= PROFILE_SLOW_MS:
+            from app.utils import cache_path
+
+            directory = PROFILE_DIR or cache_path("profiles")
+            os.makedirs(directory, exist_ok=True)
+            name = (f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{threading.get_ident()}-"
+                    f"{int(elapsed_ms)}ms-{re.sub(r'[^A-Za-z0-9_-]', '_', label)}.prof")
+            profiler.dump_stats(os.path.join(directory, name))
+            _prune_profiles(directory)
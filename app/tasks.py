@@ -1,18 +1,63 @@
 import os
 import re
 import subprocess
+import importlib
 import json
-import sqlite3
-import requests
 import shutil
-from dateutil import parser
+import time
 from datetime import datetime
-from app.utils import query_llm
+from app.cache import task_cache
+from app.intent import MIN_CONFIDENCE, extract_sql, parse_intent
+from app.llm import PROMPT_BUDGET, fit_to_budget
+from app.memo import ENABLED as MEMO_ENABLED, memo_key, result_store
+from app.metrics import action_scope, current_action, maybe_profile, record, registry, span, trace
+from app.utils import flag, query_llm
+
+MARKDOWN_ENGINE = os.getenv("MARKDOWN_ENGINE", "local")
+FORMATTER_BACKEND = os.getenv("FORMATTER_BACKEND", "prettier")
+# Handler dependencies, imported on first use; see prewarm().
+HANDLER_MODULES = (
+    "requests", "app.fetch", "app.weekdays", "app.contacts", "app.logscan", "app.titles",
+    "app.emails", "app.db", "app.markdown_html", "app.formatter", "app.csvfilter", "app.images",
+    "app.embeddings",
+)
+
+
+def prewarm(modules=None):
+    """Imports handler dependencies ahead of the first request; missing optional ones are skipped."""
+    for name in modules or HANDLER_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
 
 
-def execute_task(task_description):
-    """Parses and executes tasks based on their description using LLM for interpretation."""
-    print(f"Executing task: {task_description}")
+def interpret_locally(task_description):
+    """Interprets a task without the LLM, via the rule-based parser or the cache.
+
+    Returns a (task_info, source) tuple, or (None, None) when the LLM is needed.
+    """
+    task_info, confidence = parse_intent(task_description)
+    if task_info is not None and confidence >= MIN_CONFIDENCE:
+        return task_info, "rules"
+
+    task_info = task_cache.get(task_description)
+    if task_info is not None:
+        return task_info, "cache"
+    return None, None
+
+
+def interpret_task(task_description):
+    """Turns a task description into structured task info.
+
+    Known task shapes are parsed locally; the cache and then the LLM are only
+    consulted when the rule-based parser is not confident. Returns a
+    (task_info, source) tuple where source is "rules", "cache" or "llm";
+    task_info is an error string when the LLM response is unusable.
+    """
+    task_info, source = interpret_locally(task_description)
+    if task_info is not None:
+        return task_info, source
 
     # Use LLM to interpret the task and extract structured information
     structured_task = query_llm(
@@ -26,15 +71,85 @@ def execute_task(task_description):
 
     try:
         if not structured_task or structured_task.strip() == "":
-            return "Error: Empty response from LLM."
+            return "Error: Empty response from LLM.", "llm"
 
         if "error" in structured_task.lower():
-            return f"Error: {structured_task}"
+            return f"Error: {structured_task}", "llm"
 
         task_info = json.loads(structured_task)
     except json.JSONDecodeError:
-        return "Error: Unable to parse task description."
+        return "Error: Unable to parse task description.", "llm"
+
+    if not isinstance(task_info, dict):
+        return "Error: Unable to parse task description.", "llm"
+
+    task_cache.put(task_description, task_info)
+    return task_info, "llm"
+
+
+def execute_task(task_description, meta=None):
+    """Parses and executes tasks based on their description using LLM for interpretation.
+
+    If a `meta` dict is given it is filled with details about how the task ran
+    (e.g. `interpreted_by`).
+    """
+    print(f"Executing task: {task_description}")
+    if meta is None:
+        meta = {}
+
+    with trace() as timings, maybe_profile("task"):
+        start = time.perf_counter()
+        task_info, meta["interpreted_by"] = interpret_task(task_description)
+        kind = task_kind(task_info.get("action", "")) if isinstance(task_info, dict) else None
+        record("interpret", time.perf_counter() - start, action=kind)
 
+        if isinstance(task_info, str):
+            result = task_info
+        else:
+            result = run_structured_task(task_info, task_description, meta)
+    meta["timings_ms"] = timings
+    return result
+
+
+# Dispatch rules in priority order: a task matches when every keyword of any
+# one of its keyword groups appears in the action.
+TASK_RULES = [
+    ("A1", [("install", "run")]),
+    ("A2", [("format",)]),
+    ("A3", [("count",)]),
+    ("A4", [("sort",)]),
+    ("A5", [("extract", "log")]),
+    ("A6", [("extract", "markdown")]),
+    ("A7", [("extract", "email")]),
+    ("A8", [("extract", "credit card")]),
+    ("A9", [("find", "similar")]),
+    ("A10", [("calculate", "sales")]),
+    ("B1", [("access", "data")]),
+    ("B2", [("delete",)]),
+    ("B3", [("fetch", "api")]),
+    ("B4", [("clone", "git")]),
+    ("B5", [("sql", "query")]),
+    ("B6", [("scrape",), ("extract",)]),
+    ("B7", [("compress",), ("resize",)]),
+    ("B8", [("transcribe", "mp3")]),
+    ("B9", [("markdown", "html")]),
+    ("B10", [("csv", "filter")]),
+]
+
+
+def task_kind(action):
+    """Returns the task id (e.g. "A3") that handles an action, or None."""
+    action = action.lower()
+    for kind, keyword_groups in TASK_RULES:
+        if any(all(keyword in action for keyword in keywords) for keywords in keyword_groups):
+            return kind
+    return None
+
+
+def run_structured_task(task_info, task_description, meta=None):
+    """Executes an already interpreted task, adding any extra details to `meta`."""
+    if meta is None:
+        meta = {}
     action = task_info.get("action", "").lower()
     input_path = task_info.get("input_path", "")
     output_path = task_info.get("output_path", "")
@@ -44,11 +159,48 @@ def execute_task(task_description):
     if not check_data_directory(input_path) or not check_data_directory(output_path):
         return "Error: File paths must be within the /data directory."
 
+    kind = task_kind(action)
+    with action_scope(kind):
+        try:
+            result = _run_memoized(kind, input_path, output_path, parameters, task_description, meta)
+        except Exception:
+            registry.inc("agent_tasks_total", action=current_action(), outcome="error")
+            raise
+        outcome = "memoized" if meta.get("memoized") else "error" if result.startswith("Error") else "ok"
+        registry.inc("agent_tasks_total", action=current_action(), outcome=outcome)
+    return result
+
+
+def _run_memoized(kind, input_path, output_path, parameters, task_description, meta):
+    """Runs a task's handler, reusing the stored output of deterministic tasks on unchanged inputs."""
+    key = None
+    if MEMO_ENABLED and not flag(parameters.get("no_cache")):
+        with span("memo"):
+            key = memo_key(kind, input_path, output_path, parameters)
+            result = result_store.restore(key, output_path) if key is not None else None
+        if result is not None:
+            meta["memoized"] = True
+            return result
+
+    with span("dispatch"):
+        result = _run_handler(kind, input_path, output_path, parameters, task_description, meta)
+
+    if key is not None and not result.startswith("Error"):
+        with span("memo"):
+            result_store.save(key, output_path, result)
+    return result
+
+
+def _run_handler(kind, input_path, output_path, parameters, task_description, meta):
+    """Runs the handler for a task kind."""
     # **TASK A1: Install `uv` and run `datagen.py`**
-    if "install" in action and "run" in action:
+    if kind == "A1":
+        import requests
+        from app.fetch import fetch_to_file
+
         if not shutil.which("uv"):
             try:
-                subprocess.run(["pip", "install", "uv"], check=True)
+                _run_command(["pip", "install", "uv"], check=True)
             except subprocess.CalledProcessError:
                 return "Error installing `uv`."
 
@@ -56,225 +208,271 @@ def execute_task(task_description):
         datagen_path = "datagen.py"
 
         try:
-            response = requests.get(datagen_url)
-            response.raise_for_status()
-            with open(datagen_path, "w") as file:
-                file.write(response.text)
+            fetch_to_file(datagen_url, datagen_path)
         except requests.RequestException as e:
             return f"Error downloading datagen.py: {str(e)}"
 
         try:
-            subprocess.run(["python", datagen_path, parameters.get("email", "")], check=True)
+            _run_command(["python", datagen_path, parameters.get("email", "")], check=True)
             return "Data generation complete."
         except subprocess.CalledProcessError:
             return "Error running `datagen.py`."
 
     # **TASK A2: Format Markdown using Prettier**
-    if "format" in action:
+    if kind == "A2":
         if not os.path.exists(input_path):
             return f"Error: File {input_path} not found."
 
+        from app.formatter import FormatterError, FormatterNotFound, get_formatter
+
         try:
-            subprocess.run(["npx", "prettier", "--write", input_path], check=True)
+            formatter = get_formatter(parameters.get("formatter", FORMATTER_BACKEND))
+            meta["formatter"] = formatter.backend
+            with span("format"):
+                meta["format_status"] = formatter.format(input_path)
+            if formatter.backend == "python":
+                return "Markdown formatted successfully with the Python formatter (an approximation of prettier)."
             return "Markdown formatted successfully."
-        except subprocess.CalledProcessError:
-            return "Error running Prettier."
-        except FileNotFoundError:
+        except FormatterNotFound:
             return "Error: `npx` is not installed or not found in PATH."
+        except FormatterError:
+            return "Error running Prettier." if meta.get("formatter") == "prettier" else "Error formatting Markdown."
+        except ValueError as e:
+            return f"Error: {str(e)}"
 
     # **TASK A3: Count specific day in a file**
-    if "count" in action:
+    if kind == "A3":
+        from app.weekdays import DAYS, count_weekdays
+
         if not os.path.exists(input_path):
             return f"Error: File {input_path} not found."
 
         day_to_count = parameters.get("day", "wednesday").lower()
-        day_map = {
-            "monday": 0,
-            "tuesday": 1,
-            "wednesday": 2,
-            "thursday": 3,
-            "friday": 4,
-            "saturday": 5,
-            "sunday": 6,
-        }
-
-        if day_to_count not in day_map:
+        if day_to_count not in DAYS:
             return f"Error: Invalid day '{day_to_count}' specified."
 
         try:
-            day_count = 0
-            with open(input_path, "r", encoding="utf-8") as file:
-                for line in file:
-                    date_str = line.strip()
-                    if date_str:
-                        try:
-                            date_obj = parser.parse(date_str)
-                            if date_obj.weekday() == day_map[day_to_count]:
-                                day_count += 1
-                        except ValueError:
-                            return f"Error: Invalid date format found: {date_str}"
-
-            with open(output_path, "w", encoding="utf-8") as file:
-                file.write(str(day_count))
+            with span("io"):
+                day_count = count_weekdays(input_path)[DAYS.index(day_to_count)]
+                with open(output_path, "w", encoding="utf-8") as file:
+                    file.write(str(day_count))
 
             return f"{day_to_count.capitalize()}s counted."
         except Exception as e:
             return f"Error: {str(e)}"
 
     # **TASK A4: Sort contacts**
-    if "sort" in action:
+    if kind == "A4":
+        from app.contacts import DEFAULT_KEYS, MAX_MEMORY, sort_contacts
+
         if not os.path.exists(input_path):
             return f"Error: File {input_path} not found."
 
-        with open(input_path, "r") as file:
-            contacts = json.load(file)
-        sorted_contacts = sorted(contacts, key=lambda x: (x["last_name"], x["first_name"]))
-        with open(output_path, "w") as file:
-            json.dump(sorted_contacts, file)
+        sort_keys = parameters.get("sort_keys") or DEFAULT_KEYS
+        if isinstance(sort_keys, str):
+            sort_keys = [key.strip() for key in sort_keys.split(",")]
+        max_memory = int(float(parameters.get("max_memory_mb", 0)) * 1024 * 1024) or MAX_MEMORY
+
+        try:
+            with span("io"):
+                sort_contacts(input_path, output_path, keys=sort_keys, max_memory=max_memory)
+        except ValueError as e:
+            return f"Error: Invalid contacts file: {str(e)}"
         return "Contacts sorted."
 
     # **TASK A5: Extract first lines from recent logs**
-    if "extract" in action and "log" in action:
+    if kind == "A5":
+        from app.logscan import recent_first_lines
+
         log_dir = os.path.dirname(input_path)
         if not os.path.exists(log_dir):
             return "Error: Logs directory not found."
 
-        log_files = sorted([f for f in os.listdir(log_dir) if f.endswith(".log")],
-                           key=lambda f: os.path.getmtime(os.path.join(log_dir, f)), reverse=True)[:10]
-        with open(output_path, "w") as outfile:
-            for log_file in log_files:
-                with open(os.path.join(log_dir, log_file), "r") as infile:
-                    outfile.write(infile.readline().strip() + "\n")
+        with span("io"):
+            first_lines = recent_first_lines(
+                log_dir,
+                count=int(parameters.get("count", 10)),
+                pattern=parameters.get("pattern", "*.log"),
+                recursive=flag(parameters.get("recursive")),
+            )
+            with open(output_path, "w") as outfile:
+                for line in first_lines:
+                    outfile.write(line.strip() + "\n")
         return "Log first lines extracted."
 
     # **TASK A6: Extract Markdown titles**
-    if "extract" in action and "markdown" in action:
-        index = {}
+    if kind == "A6":
+        from app.titles import build_title_index
+
         docs_dir = os.path.dirname(input_path)
         if not os.path.exists(docs_dir):
             return "Error: Docs directory not found."
 
-        for file_name in os.listdir(docs_dir):
-            if file_name.endswith(".md"):
-                with open(os.path.join(docs_dir, file_name), "r") as file:
-                    for line in file:
-                        if line.startswith("# "):
-                            index[file_name] = line.strip("# ").strip()
-                            break
-        with open(output_path, "w") as file:
-            json.dump(index, file)
+        with span("io"):
+            index = build_title_index(docs_dir, recursive=flag(parameters.get("recursive"), True))
+            with open(output_path, "w") as file:
+                json.dump(index, file)
         return "Markdown titles indexed."
 
-    # **TASK A7: Extract sender email using LLM**
-    if "extract" in action and "email" in action:
-        email_content = open(input_path, "r").read()
-        sender_email = query_llm(f"Extract sender email from this text: {email_content}")
+    # **TASK A7: Extract sender email from the From header**
+    if kind == "A7":
+        from app.emails import read_header_block, sender_address
+
+        try:
+            with span("io"):
+                sender_email = sender_address(input_path)
+        except OSError as e:
+            return f"Error reading email: {str(e)}"
+        meta["engine"] = "local"
+        if sender_email is None:
+            # No parsable From header, so let the LLM read the header block.
+            headers = read_header_block(input_path).decode("utf-8", "replace")
+            sender_email = query_llm(
+                f"Extract the sender's email address from these email headers. Reply with the address only.\n\n"
+                f"{fit_to_budget(headers)}"
+            ).strip()
+            meta["engine"] = "llm"
         with open(output_path, "w") as file:
             file.write(sender_email)
         return "Sender email extracted."
 
     # **TASK A8: Extract credit card number using LLM**
-    if "extract" in action and "credit card" in action:
+    if kind == "A8":
         card_number = query_llm(f"Extract credit card number from this image: {input_path}")
         with open(output_path, "w") as file:
             file.write(card_number.replace(" ", ""))
         return "Credit card number extracted."
 
     # **TASK A9: Find most similar comments using embeddings**
-    if "find" in action and "similar" in action:
-        comments = open(input_path, "r").readlines()
-        most_similar = query_llm(f"Find the most similar pair in this list: {comments}")
+    if kind == "A9":
+        from app.embeddings import embed_texts, most_similar_pairs
+        from app.llm import LLMError
+
+        with open(input_path, "r") as file:
+            comments = [line.strip() for line in file if line.strip()]
+        if len(comments) < 2:
+            return "Error: At least two comments are needed to find a similar pair."
+        try:
+            top_k = int(1 if parameters.get("top_k") is None else parameters["top_k"])
+        except (TypeError, ValueError):
+            top_k = 0
+        if top_k < 1:
+            return f"Error: top_k must be a whole number of at least 1, got {parameters.get('top_k')!r}."
+
+        try:
+            vectors = embed_texts(comments, backend=parameters.get("backend"))
+        except (LLMError, KeyError) as e:
+            return f"Error computing embeddings: {str(e)}"
+        pairs = most_similar_pairs(vectors, top_k=top_k)
         with open(output_path, "w") as file:
-            file.write(most_similar)
+            file.write("\n".join(f"{comments[i]}\n{comments[j]}\n" for _, i, j in pairs))
         return "Most similar comments found."
 
     # **TASK A10: Calculate total sales for a ticket type**
-    if "calculate" in action and "sales" in action:
+    if kind == "A10":
+        from app.db import QueryError, query_value
+
         ticket_type = parameters.get("ticket_type", "Gold")
-        conn = sqlite3.connect(input_path)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT SUM(price * units) FROM tickets WHERE type='{ticket_type}'")
-        total_sales = cursor.fetchone()[0]
-        conn.close()
+        try:
+            total_sales = query_value(input_path, "SELECT SUM(price * units) FROM tickets WHERE type = ?", (ticket_type,))
+        except QueryError as e:
+            return f"Error calculating ticket sales: {str(e)}"
         with open(output_path, "w") as file:
             file.write(str(total_sales))
         return f"{ticket_type} ticket sales calculated."
 
     # **TASK B1: Prevent access to data outside /data**
-    if "access" in action and "data" in action:
+    if kind == "B1":
         if not check_data_directory(input_path):
             return "Error: Access to data outside /data is not allowed."
         return "Data access verified."
 
     # **TASK B2: Prevent data deletion**
-    if "delete" in action:
+    if kind == "B2":
         return "Error: Data deletion is not allowed."
 
     # **TASK B3: Fetch data from an API and save it**
-    if "fetch" in action and "api" in action:
+    if kind == "B3":
+        import requests
+        from app.fetch import fetch_to_file
+
         api_url = re.search(r"https?://[^\s]+", task_description)
         if not api_url:
             return "Error: No valid API URL found in task description."
         try:
-            response = requests.get(api_url.group(0))
-            response.raise_for_status()
-            with open(output_path, "w") as file:
-                json.dump(response.json(), file)
+            response = fetch_to_file(api_url.group(0), output_path)
+            if "json" not in response["content_type"]:
+                # Not labelled as JSON, so check that it parses.
+                with open(output_path, "r") as file:
+                    json.load(file)
             return "API data fetched and saved."
+        except ValueError as e:
+            return f"Error fetching API data: Response is not valid JSON: {str(e)}"
         except requests.RequestException as e:
             return f"Error fetching API data: {str(e)}"
 
     # **TASK B4: Clone a git repo and make a commit**
-    if "clone" in action and "git" in action:
+    if kind == "B4":
         repo_url = re.search(r"https?://[^\s]+", task_description)
         if not repo_url:
             return "Error: No valid Git repository URL found in task description."
         try:
-            subprocess.run(["git", "clone", repo_url.group(0), "/data/repo"], check=True)
-            subprocess.run(["git", "commit", "-m", "Automated commit"], cwd="/data/repo", check=True)
+            _run_command(["git", "clone", repo_url.group(0), "/data/repo"], check=True)
+            _run_command(["git", "commit", "-m", "Automated commit"], cwd="/data/repo", check=True)
             return "Git repository cloned and commit made."
         except subprocess.CalledProcessError:
             return "Error cloning Git repository or making commit."
 
     # **TASK B5: Run a SQL query on a SQLite or DuckDB database**
-    if "sql" in action and "query" in action:
+    if kind == "B5":
+        from app.db import QueryError, stream_query
+
         db_path = input_path
-        query = re.search(r"SELECT .+", task_description, re.IGNORECASE)
+        query = parameters.get("query") or extract_sql(task_description)
         if not query:
             return "Error: No valid SQL query found in task description."
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute(query.group(0))
-            result = cursor.fetchall()
-            conn.close()
-            with open(output_path, "w") as file:
-                json.dump(result, file)
+            stream_query(db_path, query, output_path)
             return "SQL query executed and result saved."
-        except sqlite3.Error as e:
+        except QueryError as e:
             return f"Error executing SQL query: {str(e)}"
 
     # **TASK B6: Extract data from a website (scraping)**
-    if "scrape" in action or "extract" in action:
+    if kind == "B6":
+        import requests
+        from app.fetch import fetch_to_file
+
         url = re.search(r"https?://[^\s]+", task_description)
         if not url:
             return "Error: No valid URL found in task description."
         try:
-            response = requests.get(url.group(0))
-            response.raise_for_status()
-            with open(output_path, "w") as file:
-                file.write(response.text)
+            fetch_to_file(url.group(0), output_path)
             return "Website data scraped and saved."
         except requests.RequestException as e:
             return f"Error scraping website: {str(e)}"
 
     # **TASK B7: Compress or resize an image**
-    if "compress" in action or "resize" in action:
+    if kind == "B7":
         try:
-            from PIL import Image
-            img = Image.open(input_path)
-            img = img.resize((100, 100))  # Resize to 100x100
-            img.save(output_path, optimize=True, quality=85)
+            from app.images import DEFAULT_QUALITY, has_glob, resize_image, resize_images
+            size = _image_size(parameters)
+            quality = int(parameters.get("quality", DEFAULT_QUALITY))
+            keep_aspect = flag(parameters.get("keep_aspect"), True)
+
+            # A glob or a directory resizes every matching image into output_path.
+            if has_glob(input_path) or os.path.isdir(input_path):
+                pattern = input_path if has_glob(input_path) else os.path.join(input_path, "*")
+                report = resize_images(
+                    pattern, output_path, size=size, quality=quality, keep_aspect=keep_aspect,
+                    output_format=parameters.get("format"), workers=int(parameters.get("workers") or 0) or None,
+                )
+                meta["images"] = report["images"]
+                return (
+                    f"Images compressed and resized: {report['resized']} resized, {report['skipped']} skipped, "
+                    f"{report['failed']} failed in {report['seconds']}s ({report['images_per_second']} images/s)."
+                )
+
+            resize_image(input_path, output_path, size=size, quality=quality, keep_aspect=keep_aspect)
             return "Image compressed and resized."
         except ImportError:
             return "Error: PIL library not installed."
@@ -282,7 +480,7 @@ def execute_task(task_description):
             return f"Error processing image: {str(e)}"
 
     # **TASK B8: Transcribe audio from an MP3 file**
-    if "transcribe" in action and "mp3" in action:
+    if kind == "B8":
         try:
             transcription = query_llm(f"Transcribe this audio file: {input_path}")
             with open(output_path, "w") as file:
@@ -292,25 +490,40 @@ def execute_task(task_description):
             return f"Error transcribing audio: {str(e)}"
 
     # **TASK B9: Convert Markdown to HTML**
-    if "markdown" in action and "html" in action:
+    if kind == "B9":
+        from app.markdown_html import convert_file
+
+        engine = parameters.get("engine", MARKDOWN_ENGINE)
+        meta["engine"] = engine
         try:
-            with open(input_path, "r") as md_file:
-                md_content = md_file.read()
-            html_content = query_llm(f"Convert this Markdown to HTML: {md_content}")
-            with open(output_path, "w") as html_file:
-                html_file.write(html_content)
+            if engine == "llm":
+                with open(input_path, "r") as md_file:
+                    md_content = fit_to_budget(md_file.read())
+                html_content = query_llm(f"Convert this Markdown to HTML: {md_content}", max_tokens=PROMPT_BUDGET)
+                with open(output_path, "w") as html_file:
+                    html_file.write(html_content)
+            else:
+                with span("io"):
+                    convert_file(input_path, output_path)
             return "Markdown converted to HTML."
         except Exception as e:
             return f"Error converting Markdown to HTML: {str(e)}"
 
     # **TASK B10: Filter CSV and return JSON**
-    if "csv" in action and "filter" in action:
+    if kind == "B10":
         try:
-            import pandas as pd
-            df = pd.read_csv(input_path)
-            filtered_data = df.to_json(orient="records")
-            with open(output_path, "w") as file:
-                file.write(filtered_data)
+            from app.csvfilter import CHUNK_ROWS, ENGINE, filter_csv, parse_filters
+            with span("io"):
+                filter_csv(
+                    input_path,
+                    output_path,
+                    filters=parse_filters(parameters),
+                    columns=parameters.get("columns"),
+                    output_format=parameters.get("format", "json"),
+                    chunk_rows=int(parameters.get("chunk_size", CHUNK_ROWS)),
+                    dtypes=parameters.get("dtypes"),
+                    engine=parameters.get("engine", ENGINE),
+                )
             return "CSV filtered and JSON saved."
         except ImportError:
             return "Error: pandas library not installed."
@@ -320,26 +533,38 @@ def execute_task(task_description):
     return "Unknown task"
 
 
-class InvalidDirectoryError(Exception):
-    """Custom exception to be raised when the directory check fails."""
-    pass
+def _run_command(args, **kwargs):
+    """Runs a command, timed as the task's subprocess stage."""
+    with span("subprocess"):
+        return subprocess.run(args, **kwargs)
 
 
-def check_data_directory(file_path):
-    if not file_path.startswith('/data'):
-        return False
-    return True
+def _image_size(parameters):
+    """Reads the target (width, height) from "size" ("WxH", [w, h] or n) or "width"/"height"."""
+    size = parameters.get("size")
+    if isinstance(size, str):
+        size = [int(part) for part in re.split(r"[x, ]+", size.strip().lower()) if part]
+    elif isinstance(size, (int, float)):
+        size = [int(size)]
+    if size:
+        return (int(size[0]), int(size[-1]))
+    width = int(parameters.get("width", parameters.get("height", 100)))
+    return (width, int(parameters.get("height", width)))
 
 
-def read_file(path):
-    """Reads and returns the content of a file."""
-    try:
-        if check_data_directory(path):
-            with open(path, "r") as file:
-                return file.read()
-        else:
-            raise InvalidDirectoryError(f"The directory for the path '{path}' is invalid.")
-    except FileNotFoundError:
+DATA_ROOT = "/data"
+
+
+def resolve_data_path(file_path):
+    """Returns the real path of `file_path`, or None when it resolves outside /data."""
+    if not file_path:
+        return None
+    resolved = os.path.realpath(file_path)
+    root = os.path.realpath(DATA_ROOT)
+    if os.path.commonpath([resolved, root]) != root:
         return None
-    except InvalidDirectoryError as e:
-        return str(e)
+    return resolved
+
+
+def check_data_directory(file_path):
+    return resolve_data_path(file_path) is not None
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils import cache_path
+
+READ_WORKERS = int(os.getenv("TITLES_WORKERS", "16"))
+
+_lock = threading.Lock()
+
+
+def read_title(path):
+    """Returns the text of the first H1 ("# ") line of a Markdown file, or None."""
+    with open(path, "r", errors="replace") as file:
+        for line in file:
+            if line.startswith("# "):
+                return line.strip("# ").strip()
+    return None
+
+
+def scan_markdown(docs_dir, recursive=True):
+    """Returns {relative path: (mtime_ns, size)} for the .md files under docs_dir."""
+    found = {}
+    pending = [docs_dir]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                    elif entry.name.endswith(".md"):
+                        stat = entry.stat()
+                        relative = os.path.relpath(entry.path, docs_dir).replace(os.sep, "/")
+                        found[relative] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+    return found
+
+
+def _index_path(docs_dir):
+    digest = hashlib.sha1(os.path.realpath(docs_dir).encode("utf-8")).hexdigest()[:16]
+    return cache_path(f"titles-{digest}.json")
+
+
+def _load(path):
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_title_index(docs_dir, recursive=True):
+    """Returns {relative path: title} for the Markdown files under docs_dir.
+
+    Titles are kept in a persistent index validated by (mtime, size), so only
+    new or changed files are read; those are read on a thread pool.
+    """
+    index_path = _index_path(docs_dir)
+    with _lock:
+        cached = _load(index_path)
+        current = scan_markdown(docs_dir, recursive)
+
+        entries = {}
+        changed = []
+        for relative, (mtime, size) in current.items():
+            entry = cached.get(relative)
+            if entry is not None and entry[0] == mtime and entry[1] == size:
+                entries[relative] = entry
+            else:
+                changed.append(relative)
+
+        if changed:
+            paths = [os.path.join(docs_dir, relative) for relative in changed]
+            with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(paths))) as pool:
+                for relative, title in zip(changed, pool.map(read_title, paths)):
+                    entries[relative] = [*current[relative], title]
+
+        if changed or len(entries) != len(cached):
+            tmp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as file:
+                json.dump(entries, file)
+            os.replace(tmp_path, index_path)
+
+    return {relative: entries[relative][2] for relative in sorted(entries) if entries[relative][2] is not None}
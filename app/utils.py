@@ -1,24 +1,14 @@
 import os
-from dotenv import load_dotenv
-import openai
 
+from app.llm import LLMError, get_client
 
-def query_llm(prompt):
-    load_dotenv()
 
+def query_llm(prompt, max_tokens=100):
     """Queries the LLM (GPT-4o-Mini) and returns a response."""
-    openai.api_key = os.getenv("OPENAI_API_KEY")
-    if not openai.api_key:
-        raise ValueError("API Key is missing! Check your .env file or environment variables.")
-
+    client = get_client()
     try:
-        response = openai.Completion.create(
-            model="gpt-4o-mini",
-            prompt=prompt,
-            max_tokens=100
-        )
-        return response.choices[0].text.strip()
-    except openai.error.OpenAIError as e:
+        return client.complete(prompt, max_tokens=max_tokens)
+    except LLMError as e:
         return f"LLM Error: {str(e)}"
 
 def validate_file_path(path):
@@ -29,3 +19,24 @@ def validate_file_path(path):
     if not full_path.startswith(base_dir):
         return False  # Prevents access outside `/data`
     return True
+
+
+def flag(value, default=False):
+    """Reads a boolean task parameter, which LLMs often send as a string ("false", "0", "no")."""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in ("false", "0", "no", "off", "n", ""):
+            return False
+        if text in ("true", "1", "yes", "on", "y"):
+            return True
+        return default
+    return bool(value)
+
+
+def cache_path(name):
+    """Returns a path inside the local cache directory (CACHE_DIR), creating it if needed."""
+    cache_dir = os.getenv("CACHE_DIR", ".cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, name)
@@ -0,0 +1,259 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is in requirements.txt
+    np = None
+
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+CHUNK_SIZE = 8 * 1024 * 1024
+
+_MONTHS = {
+    name: i + 1
+    for i, names in enumerate([
+        ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+        ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+        ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december"),
+    ])
+    for name in names
+}
+_TIME = r"(?:[T ]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?"
+
+# Known line formats: (pattern, order of the year/month/day groups). Each one
+# is anchored to a whole line so a chunk can be matched with a single findall.
+FORMATS = [
+    (r"(\d{4})-(\d{1,2})-(\d{1,2})" + _TIME, "ymd"),            # %Y-%m-%d[ %H:%M:%S]
+    (r"(\d{4})/(\d{1,2})/(\d{1,2})" + _TIME, "ymd"),            # %Y/%m/%d[ %H:%M:%S]
+    (r"(\d{1,2})-([A-Za-z]{3,9})-(\d{4})" + _TIME, "dby"),      # %d-%b-%Y
+    (r"([A-Za-z]{3,9}) (\d{1,2}), (\d{4})" + _TIME, "bdy"),     # %b %d, %Y
+    (r"(\d{1,2}) ([A-Za-z]{3,9}) (\d{4})" + _TIME, "dby"),      # %d %b %Y
+    (r"(\d{1,2})/(\d{1,2})/(\d{4})" + _TIME, "mdy"),            # %m/%d/%Y (dateutil's default order)
+]
+_COMPILED = [
+    (re.compile(r"^[ \t]*" + pattern + r"[ \t\r]*$", re.MULTILINE), order)
+    for pattern, order in FORMATS
+]
+_NON_BLANK = re.compile(r"^[ \t]*\S", re.MULTILINE)
+
+# Fixed-width layouts that can be decoded straight from the raw bytes when
+# every line in a chunk has the same width. y/m/d and H/M/S are digits, b is
+# a month-name letter, T is "T" or a space; anything else is a literal.
+FIXED_WIDTH = [
+    "yyyy-mm-dd",
+    "yyyy-mm-ddTHH:MM:SS",
+    "yyyy/mm/dd",
+    "yyyy/mm/dd HH:MM:SS",
+    "dd-bbb-yyyy",
+    "bbb dd, yyyy",
+]
+_MONTH_CODES = {
+    (ord(name[0]) << 16) | (ord(name[1]) << 8) | ord(name[2]): number
+    for name, number in _MONTHS.items() if len(name) == 3
+}
+
+_counts_cache = OrderedDict()
+_counts_lock = threading.Lock()
+
+
+def _to_ymd(groups, order):
+    """Reorders regex groups into (year, month, day) strings/ints."""
+    if order == "ymd":
+        return groups
+    if order == "mdy":
+        return [(y, m, d) for m, d, y in groups]
+    if order == "dby":
+        return [(y, _MONTHS.get(b.lower(), 0), d) for d, b, y in groups]
+    return [(y, _MONTHS.get(b.lower(), 0), d) for b, d, y in groups]  # bdy
+
+
+def _count_ymd(rows):
+    """Returns per-weekday counts for (year, month, day) rows, or None if any row is invalid."""
+    if not rows:
+        return [0] * 7
+    if np is None:
+        counts = [0] * 7
+        try:
+            for y, m, d in rows:
+                counts[date(int(y), int(m), int(d)).weekday()] += 1
+        except ValueError:
+            return None
+        return counts
+
+    ymd = np.array(rows).astype(np.int64)
+    return _weekday_counts(ymd[:, 0], ymd[:, 1], ymd[:, 2])
+
+
+def _weekday_counts(y, m, d):
+    """Returns per-weekday counts for year/month/day arrays, or None if any date is invalid."""
+    month = np.clip(m, 1, 12) - 1
+    leap = (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0))
+    month_days = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])[month] + ((m == 2) & leap)
+    if not ((m >= 1) & (m <= 12) & (d >= 1) & (d <= month_days) & (y >= 1)).all():
+        return None
+
+    # Sakamoto's algorithm gives 0 = Sunday; shift so that 0 = Monday.
+    yy = y - (m < 3)
+    offsets = np.array([0, 3, 2, 5, 0, 3, 5, 1, 4, 6, 2, 4])[month]
+    weekday = (yy + yy // 4 - yy // 100 + yy // 400 + offsets + d + 6) % 7
+    return np.bincount(weekday, minlength=7).tolist()
+
+
+def _digits(columns):
+    value = 0
+    for column in columns:
+        value = value * 10 + (column.astype(np.int64) - 48)
+    return value
+
+
+def _count_fixed_width(block):
+    """Decodes a chunk of identical-width lines in bulk, or returns None if it doesn't fit a layout."""
+    if np is None:
+        return None
+    width = block.find(b"\n") + 1
+    if width < 2 or len(block) % width:
+        return None
+    rows = np.frombuffer(block, dtype=np.uint8).reshape(-1, width)
+    if not (rows[:, -1] == 10).all():
+        return None
+    text_width = width - 1
+    if rows[0, text_width - 1] == 13:
+        if not (rows[:, text_width - 1] == 13).all():
+            return None
+        text_width -= 1
+
+    for layout in FIXED_WIDTH:
+        if len(layout) != text_width:
+            continue
+        ok = True
+        fields = {}
+        for i, kind in enumerate(layout):
+            column = rows[:, i]
+            if kind in "ymdHMS":
+                ok = ((column >= 48) & (column <= 57)).all()
+                fields.setdefault(kind, []).append(column)
+            elif kind == "b":
+                ok = ((column | 32) >= 97).all() and ((column | 32) <= 122).all()
+                fields.setdefault(kind, []).append(column | 32)
+            elif kind == "T":
+                ok = ((column == 84) | (column == 32)).all()
+            else:
+                ok = (column == ord(kind)).all()
+            if not ok:
+                break
+        if not ok:
+            continue
+
+        y, d = _digits(fields["y"]), _digits(fields["d"])
+        if "b" in fields:
+            b0, b1, b2 = (c.astype(np.int64) for c in fields["b"])
+            codes = np.array(sorted(_MONTH_CODES))
+            found = np.searchsorted(codes, (b0 << 16) | (b1 << 8) | b2).clip(0, len(codes) - 1)
+            if not (codes[found] == ((b0 << 16) | (b1 << 8) | b2)).all():
+                return None
+            m = np.array([_MONTH_CODES[c] for c in codes])[found]
+        else:
+            m = _digits(fields["m"])
+        if "H" in fields and not (
+            (_digits(fields["H"]) < 24).all() and (_digits(fields["M"]) < 60).all()
+            and (_digits(fields["S"]) < 60).all()
+        ):
+            return None
+        return _weekday_counts(y, m, d)
+    return None
+
+
+def _count_slow(block):
+    """Parses a block line by line, falling back to dateutil for unknown formats."""
+    from dateutil import parser
+
+    counts = [0] * 7
+    for line in block.splitlines():
+        date_str = line.strip()
+        if not date_str:
+            continue
+        for regex, order in _COMPILED:
+            match = regex.match(date_str)
+            if match:
+                y, m, d = _to_ymd([match.groups()], order)[0]
+                try:
+                    counts[date(int(y), int(m), int(d)).weekday()] += 1
+                    break
+                except ValueError:
+                    pass
+        else:
+            try:
+                counts[parser.parse(date_str).weekday()] += 1
+            except (ValueError, OverflowError):
+                raise ValueError(f"Invalid date format found: {date_str}")
+    return counts
+
+
+def _count_block(raw, formats):
+    """Counts weekdays in a chunk of whole lines.
+
+    Uniform fixed-width chunks are decoded in bulk from the bytes; otherwise the
+    known formats are matched a chunk at a time (recently seen ones first), and
+    only a chunk with unrecognised lines is parsed line by line.
+    """
+    counts = _count_fixed_width(raw)
+    if counts is not None:
+        return counts
+
+    block = raw.decode("utf-8")
+    expected = len(_NON_BLANK.findall(block))
+    counts = [0] * 7
+    matched = 0
+    for i, (regex, order) in enumerate(list(formats)):
+        groups = regex.findall(block)
+        if not groups:
+            continue
+        block_counts = _count_ymd(_to_ymd(groups, order))
+        if block_counts is None:
+            return _count_slow(block)
+        counts = [a + b for a, b in zip(counts, block_counts)]
+        matched += len(groups)
+        if i:
+            formats.insert(0, formats.pop(i))
+        if matched == expected:
+            return counts
+    return _count_slow(block)
+
+
+def count_weekdays(path, chunk_size=CHUNK_SIZE):
+    """Returns the number of dates in a file falling on each weekday (Monday first).
+
+    Results are cached by (path, mtime, size), so asking for another weekday of
+    an unchanged file does not re-read it.
+    """
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_mtime_ns, stat.st_size)
+    with _counts_lock:
+        if key in _counts_cache:
+            _counts_cache.move_to_end(key)
+            return list(_counts_cache[key])
+
+    formats = list(_COMPILED)
+    counts = [0] * 7
+    remainder = b""
+    with open(path, "rb") as file:
+        while True:
+            data = file.read(chunk_size)
+            if not data:
+                break
+            data = remainder + data
+            cut = data.rfind(b"\n") + 1
+            block, remainder = data[:cut], data[cut:]
+            if block:
+                counts = [a + b for a, b in zip(counts, _count_block(block, formats))]
+    if remainder:
+        counts = [a + b for a, b in zip(counts, _count_block(remainder + b"\n", formats))]
+
+    with _counts_lock:
+        _counts_cache[key] = counts
+        while len(_counts_cache) > 32:
+            _counts_cache.popitem(last=False)
+    return list(counts)
@@ -0,0 +1,72 @@
+"""Peak RSS of the contacts sort (task A4) against input size.
+
+Compares the old in-memory approach (json.load + sorted) with the streaming
+external sort. Each measurement runs in a fresh subprocess.
+
+Usage: python -m benchmarks.bench_contacts_sort [--sizes 100000 500000 1000000] [--memory-mb 64]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+if {mode!r} == "in-memory":
+    with open({src!r}) as file:
+        contacts = json.load(file)
+    with open({dst!r}, "w") as file:
+        json.dump(sorted(contacts, key=lambda x: (x["last_name"], x["first_name"])), file)
+else:
+    from app.contacts import sort_contacts
+    sort_contacts({src!r}, {dst!r}, max_memory={memory})
+elapsed = time.perf_counter() - start
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, elapsed)
+"""
+
+
+def generate(path, count, seed=0):
+    rng = random.Random(seed)
+    first = ["Alice", "Bob", "Charlie", "Dana", "Eve", "Frank", "Grace", "Heidi"]
+    last = ["Smith", "Johnson", "Brown", "Lee", "Garcia", "Martin", "Wong", "Singh"]
+    with open(path, "w") as file:
+        file.write("[")
+        for i in range(count):
+            if i:
+                file.write(", ")
+            json.dump({
+                "first_name": rng.choice(first),
+                "last_name": f"{rng.choice(last)}{rng.randrange(10000)}",
+                "email": f"user{i}@example.com",
+            }, file)
+        file.write("]")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 500000, 1000000])
+    arg_parser.add_argument("--memory-mb", type=int, default=64)
+    args = arg_parser.parse_args()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    print(f"{'contacts':>10} {'input MB':>9} {'mode':>10} {'peak RSS MB':>12} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            src, dst = os.path.join(tmp, "contacts.json"), os.path.join(tmp, "sorted.json")
+            generate(src, size)
+            input_mb = os.path.getsize(src) / 2**20
+            for mode in ("in-memory", "streaming"):
+                code = CHILD.format(root=root, mode=mode, src=src, dst=dst,
+                                    memory=args.memory_mb * 2**20)
+                out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+                rss_kb, elapsed = out.stdout.split()
+                print(f"{size:>10} {input_mb:>9.1f} {mode:>10} {int(rss_kb) / 1024:>12.1f} {float(elapsed):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
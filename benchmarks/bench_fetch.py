@@ -0,0 +1,106 @@
+"""Cold vs. warm latency of the shared fetch layer (tasks B3/B6) against a local http.server.
+
+Usage: python -m benchmarks.bench_fetch [--size-mb 8] [--runs 20] [--latency 0.05]
+"""
+import argparse
+import hashlib
+import os
+import statistics
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from app import fetch
+
+
+def make_handler(directory, latency, cache_control):
+    class CachingHandler(SimpleHTTPRequestHandler):
+        """Static files with ETag / If-None-Match support and a fixed Cache-Control."""
+
+        protocol_version = "HTTP/1.1"
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=directory, **kwargs)
+
+        def send_head(self):
+            time.sleep(latency)
+            path = self.translate_path(self.path)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                etag = '"%s"' % hashlib.md5(f"{stat.st_mtime_ns}-{stat.st_size}".encode()).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Cache-Control", cache_control)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return None
+                self._etag = etag
+            return super().send_head()
+
+        def end_headers(self):
+            if getattr(self, "_etag", None):
+                self.send_header("ETag", self._etag)
+                self.send_header("Cache-Control", cache_control)
+                self._etag = None
+            super().end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    return CachingHandler
+
+
+def serve(directory, latency, cache_control):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(directory, latency, cache_control))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def timed(function, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size-mb", type=float, default=8)
+    arg_parser.add_argument("--runs", type=int, default=20)
+    arg_parser.add_argument("--latency", type=float, default=0.05, help="server think time in seconds")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as site, tempfile.TemporaryDirectory() as work:
+        os.environ["CACHE_DIR"] = os.path.join(work, "cache")
+        with open(os.path.join(site, "data.json"), "wb") as file:
+            file.write(b"[" + b"1234567890," * int(args.size_mb * 2**20 / 11) + b"0]")
+        output = os.path.join(work, "out.json")
+
+        for cache_control, label in (("no-cache", "304"), ("max-age=3600", "fresh")):
+            server, base = serve(site, args.latency, cache_control)
+            url = f"{base}/data.json"
+
+            def bare():
+                response = requests.get(url)
+                with open(output, "wb") as file:
+                    file.write(response.content)
+
+            def cold():
+                fetch.fetch_to_file(url, output, use_cache=False)
+
+            fetch.fetch_to_file(url, output)
+            print(f"[Cache-Control: {cache_control}]")
+            print(f"  bare requests.get : {timed(bare, args.runs):8.1f} ms")
+            print(f"  cold, no cache    : {timed(cold, args.runs):8.1f} ms")
+            print(f"  warm, {label:<11} : {timed(lambda: fetch.fetch_to_file(url, output), args.runs):8.1f} ms")
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""A2 throughput: files/s for a prettier spawn per request vs. the batched formatter service.
+
+Every file is submitted from --concurrency threads, as concurrent /run
+requests would. Modes:
+
+    spawn       one `prettier --write <file>` process per file (the old A2)
+    prettier    FormatterService with the prettier backend, one process per batch
+    python      FormatterService with the pure-Python backend
+    warm        the python service again over the same, already formatted files
+
+prettier modes are skipped when `prettier --version` does not answer within
+--probe-timeout seconds (npx with no network, or no Node at all).
+
+Usage: python -m benchmarks.bench_formatter [--files 200] [--concurrency 8]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+WORK_DIR = tempfile.mkdtemp(prefix="bench-formatter-")
+os.environ["CACHE_DIR"] = os.path.join(WORK_DIR, "cache")
+os.makedirs(os.environ["CACHE_DIR"], exist_ok=True)
+
+from app.formatter import FormatterService, prettier_command  # noqa: E402
+
+SAMPLE = """Title {n}
+=====
+*  first item with *emphasis*
++  second item with __strong__ text
+
+
+
+| name | count |
+|-|-:|
+| row{n} | {n} |
+***
+Some trailing spaces here
+```python
+def keep(x):   return x
+```
+"""
+
+
+def make_files(directory, count):
+    os.makedirs(directory)
+    paths = []
+    for n in range(count):
+        path = os.path.join(directory, f"doc{n}.md")
+        with open(path, "w") as file:
+            file.write(SAMPLE.format(n=n))
+        paths.append(path)
+    return paths
+
+
+def run(label, paths, concurrency, format_one):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(format_one, paths))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<9}: {len(paths) / elapsed:9.1f} files/s  ({elapsed * 1000:8.1f} ms for {len(paths)} files)")
+    return elapsed
+
+
+def prettier_available(command, timeout):
+    if command is None:
+        return False
+    try:
+        subprocess.run(command + ["--version"], check=True, timeout=timeout, capture_output=True)
+        return True
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--files", type=int, default=200)
+    arg_parser.add_argument("--concurrency", type=int, default=8)
+    arg_parser.add_argument("--probe-timeout", type=float, default=60)
+    args = arg_parser.parse_args()
+
+    try:
+        command = prettier_command()
+        results = {}
+        if prettier_available(command, args.probe_timeout):
+            paths = make_files(os.path.join(WORK_DIR, "spawn"), args.files)
+            results["spawn"] = run("spawn", paths, args.concurrency, lambda path: subprocess.run(
+                command + ["--write", path], check=True, capture_output=True))
+
+            service = FormatterService("prettier")
+            paths = make_files(os.path.join(WORK_DIR, "prettier"), args.files)
+            results["prettier"] = run("prettier", paths, args.concurrency, service.format)
+            print(f"{'':<9}  {service.stats['invocations']} prettier invocations in {service.stats['batches']} batches")
+        else:
+            print(f"prettier ({' '.join(command or ['none'])}) is not available; skipping the prettier modes.")
+
+        service = FormatterService("python")
+        paths = make_files(os.path.join(WORK_DIR, "python"), args.files)
+        results["python"] = run("python", paths, args.concurrency, service.format)
+        results["warm"] = run("warm", paths, args.concurrency, service.format)
+        print(f"{'':<9}  {service.stats['skipped']} of {service.stats['files']} files skipped by content hash")
+
+        if "spawn" in results:
+            for label in ("prettier", "python", "warm"):
+                print(f"{label} vs spawn: {results['spawn'] / results[label]:.1f}x")
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Benchmarks the pooled LLM client against the stub server.
+
+Usage: python -m benchmarks.bench_llm_client [--calls 200] [--latency 0.01]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from app.llm import LLMClient
+from benchmarks import stub_llm
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--calls", type=int, default=200)
+    arg_parser.add_argument("--latency", type=float, default=0.01)
+    args = arg_parser.parse_args()
+
+    server, base_url = stub_llm.start(args.latency)
+    client = LLMClient(None, base_url=base_url)
+    payload = {"model": "stub", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 5}
+
+    start = time.perf_counter()
+    for i in range(args.calls):
+        requests.post(base_url + "/chat/completions", json=payload, timeout=30).json()
+    fresh = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(args.calls):
+        client.complete(f"prompt {i}", max_tokens=5)
+    pooled = time.perf_counter() - start
+
+    handler = server.RequestHandlerClass
+    before = handler.requests_seen
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(lambda _: client.complete("same prompt", max_tokens=5), range(args.calls)))
+    coalesced = time.perf_counter() - start
+
+    print(f"fresh connection per call : {args.calls / fresh:8.1f} calls/s")
+    print(f"pooled session            : {args.calls / pooled:8.1f} calls/s")
+    print(f"{args.calls} concurrent identical : {coalesced * 1000:8.1f} ms, "
+          f"{handler.requests_seen - before} upstream requests")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Local Markdown renderer (B9) and From-header parser (A7) vs. the LLM round-trip, against the stub LLM.
+
+The stub waits --latency seconds per call plus --ms-per-kb for each KB of
+prompt, to stand in for model time growing with input size.
+
+Usage: python -m benchmarks.bench_local_engines [--runs 10] [--latency 0.2] [--ms-per-kb 5]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from app.emails import sender_address
+from app.llm import LLMClient
+from app.markdown_html import convert_file
+from benchmarks import stub_llm
+
+SECTION = """## Section {i}
+
+Some *emphasis*, **strong text**, `inline code` and a [link](https://example.com/{i}).
+
+- first item
+- second item with more words in it
+  - nested item
+
+```python
+def handler_{i}(x):
+    return x * {i}
+```
+
+"""
+
+
+def timed(function, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--runs", type=int, default=10)
+    arg_parser.add_argument("--latency", type=float, default=0.2, help="stub seconds per call")
+    arg_parser.add_argument("--ms-per-kb", type=float, default=5.0, help="stub milliseconds per KB of prompt")
+    args = arg_parser.parse_args()
+
+    def reply(prompt):
+        time.sleep(len(prompt) / 1024 * args.ms_per_kb / 1000)
+        return "stub reply"
+
+    server, base_url = stub_llm.start(args.latency, reply)
+    client = LLMClient(None, base_url=base_url)
+
+    with tempfile.TemporaryDirectory() as work:
+        output = os.path.join(work, "out")
+
+        for sections in (1, 100, 5000):
+            path = os.path.join(work, f"doc{sections}.md")
+            with open(path, "w") as file:
+                file.write("# Document\n\n" + "".join(SECTION.format(i=i) for i in range(sections)))
+
+            def llm():
+                with open(path) as file:
+                    reply = client.complete(f"Convert this Markdown to HTML: {file.read()}", max_tokens=100)
+                with open(output, "w") as file:
+                    file.write(reply)
+
+            size_kb = os.path.getsize(path) / 1024
+            print(f"[B9 markdown, {size_kb:,.1f} KB]")
+            print(f"  llm   : {timed(llm, args.runs):10.1f} ms")
+            print(f"  local : {timed(lambda: convert_file(path, output), args.runs):10.1f} ms")
+
+        for body_kb in (1, 1024):
+            path = os.path.join(work, f"email{body_kb}.txt")
+            with open(path, "w") as file:
+                file.write('From: "Jane Doe" <jane@example.com>\nTo: bob@example.com\nSubject: Hello\n\n')
+                file.write("Lorem ipsum dolor sit amet.\n" * (body_kb * 1024 // 28))
+
+            def llm():
+                with open(path) as file:
+                    client.complete(f"Extract sender email from this text: {file.read()}", max_tokens=100)
+
+            print(f"[A7 sender, {body_kb:,} KB body]")
+            print(f"  llm   : {timed(llm, args.runs):10.1f} ms")
+            print(f"  local : {timed(lambda: sender_address(path), args.runs):10.3f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
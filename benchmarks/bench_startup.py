@@ -0,0 +1,91 @@
+"""Cold-start cost: app import time, and time until a fresh server answers requests.
+
+Each measurement runs in a new interpreter so nothing is cached in-process.
+
+Usage: python -m benchmarks.bench_startup [--runs 5] [--workers 2]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); "
+    "from app.api import create_app; create_app(); "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+
+def import_ms(env):
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def ready_ms(args, env, timeout=30):
+    """Starts run.py with `args` and returns (ms until it serves a request, ms for the first task)."""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "run.py", "--port", str(port), *args], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/cache/stats", timeout=1).read()
+                break
+            except OSError:
+                if time.perf_counter() - start > timeout:
+                    raise RuntimeError(f"server did not start within {timeout}s")
+                time.sleep(0.01)
+        ready = (time.perf_counter() - start) * 1000
+
+        task = urllib.request.quote("Count the number of Wednesdays in /data/_bench/dates.txt into /data/_bench/out.txt")
+        first = time.perf_counter()
+        request = urllib.request.Request(f"http://127.0.0.1:{port}/run?task={task}", method="POST")
+        urllib.request.urlopen(request, timeout=30).read()
+        return ready, (time.perf_counter() - first) * 1000
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--runs", type=int, default=5)
+    arg_parser.add_argument("--workers", type=int, default=2)
+    args = arg_parser.parse_args()
+
+    base_env = dict(os.environ, PYTHONDONTWRITEBYTECODE="0", MEMO_ENABLED="0")
+    for label, extra in (("lazy", {"PREWARM": "0"}), ("prewarmed", {"PREWARM": "1"})):
+        env = dict(base_env, **extra)
+        samples = [import_ms(env) for _ in range(args.runs)]
+        print(f"import + create_app ({label:<9}) : {statistics.median(samples):8.1f} ms")
+
+    if not os.path.isdir("/data"):
+        print("/data does not exist; skipping the server measurements.")
+        return
+    os.makedirs("/data/_bench", exist_ok=True)
+    with open("/data/_bench/dates.txt", "w") as file:
+        file.write("2024-01-03\n" * 1000)
+
+    for label, server_args in (("dev", []), ("prod", ["--prod", "--workers", str(args.workers)])):
+        for warm in ("0", "1"):
+            env = dict(base_env, PREWARM=warm)
+            results = [ready_ms(server_args, env) for _ in range(args.runs)]
+            print(f"{label:<4} PREWARM={warm}: ready in {statistics.median(r[0] for r in results):8.1f} ms, "
+                  f"first task {statistics.median(r[1] for r in results):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""End-to-end benchmarks for every task action and the HTTP endpoints, with query_llm stubbed out.
+
+Generates a dataset with datagen.py under --data-dir (which must be inside
+/data), runs each action through execute_task and each endpoint through the
+Flask test client, and reports throughput, latency percentiles and peak
+traced (tracemalloc) memory. Results can be saved as a named baseline in
+benchmarks/baselines/ and later runs compared against it.
+
+A1, A2 and B4 need the network, npx or git and only run with --include-external.
+Memoization is off unless --memo is given, so repeated runs do the real work.
+
+Usage: python -m benchmarks.run_benchmarks [--size small|medium|large] [--iterations 20] [--only A3,B10]
+                                           [--save-baseline NAME] [--compare NAME] [--threshold 0.25]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+EXTERNAL = {"A1", "A2", "B4"}
+# Cases whose correct result is an error (B2 refuses to delete).
+EXPECTED_ERRORS = {"B2"}
+
+
+def task_cases(data_dir, base_url):
+    """Returns (name, task description, interpretation the stub LLM gives for it) for each action."""
+    d = data_dir
+    cases = [
+        ("A1", f"Install uv and run datagen.py with bench@example.com", None),
+        ("A2", f"Format {d}/docs/file_0.md with prettier", None),
+        ("A3", f"Count the number of Wednesdays in {d}/dates.txt and write the count to {d}/dates-wednesdays.txt", None),
+        ("A4", f"Sort the contacts in {d}/contacts.json by last_name then first_name and write to {d}/contacts-sorted.json", None),
+        ("A5", f"Write the first line of the 10 most recent .log files in {d}/logs/ to {d}/logs-recent.txt", None),
+        ("A6", f"Extract the H1 titles of the Markdown files in {d}/docs/ and write the index to {d}/docs/index.json", None),
+        ("A7", f"Extract the sender's email address from {d}/email.txt and write it to {d}/email-sender.txt", None),
+        ("A8", f"Extract the credit card number from {d}/credit-card.png and write it to {d}/credit-card.txt", None),
+        ("A9", f"Find the most similar pair of comments in {d}/comments.txt using embeddings and write them to {d}/comments-similar.txt", None),
+        ("A10", f'Calculate the total sales of "Gold" tickets in {d}/ticket-sales.db and write it to {d}/ticket-sales-gold.txt', None),
+        ("B1", f"Check access to data in {d}/dates.txt",
+         {"action": "check data access", "input_path": f"{d}/dates.txt", "output_path": f"{d}/dates.txt", "parameters": {}}),
+        ("B2", f"Delete {d}/dates.txt", None),
+        ("B3", f"Fetch data from the API {base_url}/data.json and save it to {d}/api.json", None),
+        ("B4", f"Clone the git repo https://github.com/octocat/Hello-World and make a commit", None),
+        ("B5", f"Run the SQL query SELECT type, SUM(units) FROM tickets GROUP BY type on {d}/ticket-sales.db and save the result to {d}/sql.json", None),
+        ("B6", f"Scrape the website {base_url}/page.html and save it to {d}/page.html", None),
+        ("B7", f"Resize the image {d}/photo.png and save it to {d}/photo-small.png", None),
+        ("B8", f"Transcribe the audio in {d}/audio.mp3 to {d}/audio.txt", None),
+        ("B9", f"Convert the Markdown file {d}/docs/file_0.md to HTML and save it to {d}/file_0.html", None),
+        ("B10", f"Filter the CSV file {d}/data.csv and save the rows as JSON to {d}/data-filtered.json", None),
+        ("B10 filter", f"Filter the CSV file {d}/data.csv where city equals Paris and age > 40 "
+                       f"and save the rows as JSON to {d}/data-paris.json", None),
+    ]
+    return cases
+
+
+def make_stub_llm(interpretations):
+    """Returns a query_llm replacement with canned answers, so runs measure the agent rather than the model."""
+    def stub_query_llm(prompt, max_tokens=100):
+        if "Task description:" in prompt:
+            description = prompt.rsplit("Task description:", 1)[1].strip()
+            return json.dumps(interpretations.get(description) or {"action": "unknown"})
+        if "credit card" in prompt:
+            return "4111 1111 1111 1111"
+        if "Transcribe" in prompt:
+            return "Stub transcription."
+        if "Markdown to HTML" in prompt:
+            return "<p>stub</p>"
+        if "email" in prompt:
+            return "sender@example.com"
+        return "stub"
+    return stub_query_llm
+
+
+def prepare_data(data_dir, size, workers, site_dir):
+    import datagen
+
+    datagen.main(["bench@example.com", "--size", size, "--seed", "0", "--workers", str(workers),
+                  "--out-dir", data_dir, "--mixed-date-formats"])
+    with open(os.path.join(data_dir, "audio.mp3"), "wb") as file:
+        file.write(b"ID3" + bytes(1024))
+    try:
+        from PIL import Image
+
+        Image.new("RGB", (1600, 1200), (120, 80, 200)).save(os.path.join(data_dir, "photo.png"))
+    except ImportError:
+        pass
+    with open(os.path.join(site_dir, "data.json"), "w") as file:
+        json.dump([{"id": i, "value": i * i} for i in range(10_000)], file)
+    with open(os.path.join(site_dir, "page.html"), "w") as file:
+        file.write("<html><body>" + "<p>Lorem ipsum dolor sit amet.</p>" * 2_000 + "</body></html>")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(directory):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+def measure(function, iterations, max_seconds):
+    """Runs `function` (returning True on success) and returns latency, throughput and memory stats."""
+    # execute_task prints every task it runs; keep that out of the report.
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _measure(function, iterations, max_seconds)
+
+
+def _measure(function, iterations, max_seconds):
+    function()  # warm-up: imports, caches, connection pools
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        errors += not function()
+        latencies.append((time.perf_counter() - start) * 1000)
+        if time.perf_counter() - started > max_seconds:
+            break
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    return {
+        "runs": len(latencies),
+        "errors": errors,
+        "ops_per_second": round(len(latencies) / (total / 1000), 2) if total else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p90_ms": round(percentile(latencies, 0.90), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "peak_mb": round(peak / 2**20, 3),
+    }
+
+
+def run_task_cases(cases, iterations, max_seconds):
+    from app.tasks import execute_task
+
+    results = {}
+    for name, description, _ in cases:
+        def run(description=description, expect_error=name in EXPECTED_ERRORS):
+            return str(execute_task(description, {})).startswith(("Error", "Unknown")) == expect_error
+        results[name] = measure(run, iterations, max_seconds)
+        print_row(name, results[name])
+    return results
+
+
+def run_http_cases(cases, data_dir, iterations, max_seconds):
+    from app.api import create_app
+
+    client = create_app().test_client()
+    descriptions = [description for _, description, _ in cases]
+    a3 = next(description for name, description, _ in cases if name == "A3")
+
+    def run_sync():
+        return client.post("/run", query_string={"task": a3}).status_code == 200
+
+    def run_async():
+        response = client.post("/run", query_string={"task": a3, "mode": "async"})
+        if response.status_code != 202:
+            return False
+        while True:
+            job = client.get(response.headers["Location"]).get_json()
+            if job["status"] not in ("queued", "running"):
+                return job["status"] == "done"
+            time.sleep(0.001)
+
+    endpoints = [
+        ("POST /run", run_sync),
+        ("POST /run async + GET /jobs", run_async),
+        ("POST /run/batch", lambda: client.post("/run/batch", json={"tasks": descriptions}).status_code == 200),
+        ("GET /read", lambda: client.get("/read", query_string={"path": f"{data_dir}/dates.txt"}).status_code == 200),
+        ("GET /cache/stats", lambda: client.get("/cache/stats").status_code == 200),
+        ("GET /metrics", lambda: client.get("/metrics").status_code == 200),
+    ]
+    results = {}
+    for name, function in endpoints:
+        results[name] = measure(function, iterations, max_seconds)
+        print_row(name, results[name])
+    return results
+
+
+def print_header():
+    print(f"{'case':<28} {'runs':>5} {'err':>4} {'ops/s':>10} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'peak MB':>9}")
+
+
+def print_row(name, stats):
+    print(f"{name:<28} {stats['runs']:>5} {stats['errors']:>4} {stats['ops_per_second']:>10.2f} {stats['p50_ms']:>10.2f} "
+          f"{stats['p90_ms']:>10.2f} {stats['p99_ms']:>10.2f} {stats['peak_mb']:>9.2f}")
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Prints p50 and peak memory changes against a baseline and returns the regressed cases."""
+    regressions = []
+    print(f"\n{'case':<28} {'p50 base':>10} {'p50 now':>10} {'change':>8} {'peak base':>10} {'peak now':>9}")
+    for name, stats in results.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        change = stats["p50_ms"] / old["p50_ms"] - 1 if old["p50_ms"] else 0.0
+        flag = ""
+        slower = change > threshold and stats["p50_ms"] - old["p50_ms"] > min_delta_ms
+        if slower or stats["peak_mb"] > old["peak_mb"] * (1 + threshold) + 0.5:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28} {old['p50_ms']:>10.2f} {stats['p50_ms']:>10.2f} {change:>+8.0%} "
+              f"{old['peak_mb']:>10.2f} {stats['peak_mb']:>9.2f}{flag}")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--size", choices=("small", "medium", "large"), default="small")
+    arg_parser.add_argument("--data-dir", default="/data/_benchmarks")
+    arg_parser.add_argument("--skip-datagen", action="store_true", help="reuse the data already in --data-dir")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="datagen processes")
+    arg_parser.add_argument("--iterations", type=int, default=20)
+    arg_parser.add_argument("--max-seconds", type=float, default=30, help="time limit per case")
+    arg_parser.add_argument("--only", help="comma-separated cases to run, e.g. A3,B10,http")
+    arg_parser.add_argument("--include-external", action="store_true", help="also run A1, A2 and B4")
+    arg_parser.add_argument("--memo", action="store_true", help="leave result memoization on")
+    arg_parser.add_argument("--save-baseline", metavar="NAME")
+    arg_parser.add_argument("--compare", metavar="NAME")
+    arg_parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging")
+    arg_parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore p50 changes smaller than this")
+    arg_parser.add_argument("--output", help="also write the results as JSON to this path")
+    args = arg_parser.parse_args()
+
+    if not args.data_dir.startswith("/data/"):
+        arg_parser.error("--data-dir must be inside /data, where tasks are allowed to run")
+
+    # Configure the app before it is imported: isolated caches, no memoization, local embeddings.
+    cache_dir = tempfile.mkdtemp(prefix="bench-cache-")
+    os.environ["CACHE_DIR"] = cache_dir
+    os.environ["TASK_CACHE_PERSIST"] = "0"
+    os.environ.setdefault("EMBEDDING_BACKEND", "local")
+    if not args.memo:
+        os.environ["MEMO_ENABLED"] = "0"
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    site_dir = tempfile.mkdtemp(prefix="bench-site-")
+    server, base_url = serve(site_dir)
+    try:
+        if not args.skip_datagen:
+            os.makedirs(args.data_dir, exist_ok=True)
+            prepare_data(args.data_dir, args.size, args.workers, site_dir)
+
+        cases = task_cases(args.data_dir, base_url)
+        if not args.include_external:
+            cases = [case for case in cases if case[0] not in EXTERNAL]
+        selected = set(args.only.split(",")) if args.only else None
+        task_list = [case for case in cases if selected is None or case[0] in selected]
+
+        import app.batch
+        import app.tasks
+        import app.utils
+
+        stub = make_stub_llm({description: info for _, description, info in cases if info})
+        app.tasks.query_llm = app.utils.query_llm = app.batch.query_llm = stub
+
+        print_header()
+        results = run_task_cases(task_list, args.iterations, args.max_seconds)
+        if selected is None or "http" in selected:
+            results.update(run_http_cases(cases, args.data_dir, args.iterations, args.max_seconds))
+    finally:
+        server.shutdown()
+        shutil.rmtree(site_dir, ignore_errors=True)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "size": args.size,
+            "iterations": args.iterations,
+            "memo": args.memo,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save_baseline}.json")
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nBaseline saved to {path}")
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json")) as file:
+            baseline = json.load(file)
+        if baseline["meta"].get("size") != args.size:
+            print(f"\nWarning: baseline was recorded with --size {baseline['meta'].get('size')}")
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
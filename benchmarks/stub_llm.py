@@ -0,0 +1,76 @@
+"""Minimal OpenAI-compatible stub server for local benchmarks.
+
+Point the app at it with LLM_BASE_URL=http://127.0.0.1:<port>/v1.
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(latency=0.0, reply=None):
+    """Builds a request handler that answers completions with `reply(prompt)` after `latency` seconds."""
+    reply = reply or (lambda prompt: "stub reply")
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+        requests_seen = 0
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            type(self).requests_seen += 1
+            time.sleep(latency)
+
+            if self.path.endswith("/chat/completions"):
+                prompt = payload["messages"][-1]["content"]
+                body = {"choices": [{"message": {"role": "assistant", "content": reply(prompt)}}]}
+            elif self.path.endswith("/embeddings"):
+                body = {"data": [
+                    {"index": i, "embedding": _fake_embedding(text)}
+                    for i, text in enumerate(payload["input"])
+                ]}
+            else:
+                self.send_error(404)
+                return
+
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def _fake_embedding(text, dims=32):
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [(digest[i % len(digest)] - 128) / 128 for i in range(dims)]
+
+
+def start(latency=0.0, reply=None, port=0):
+    """Starts the stub in a background thread and returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, reply))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--port", type=int, default=8001)
+    arg_parser.add_argument("--latency", type=float, default=0.3, help="seconds per response")
+    args = arg_parser.parse_args()
+    server, base_url = start(args.latency, port=args.port)
+    print(f"Stub LLM listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
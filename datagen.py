@@ -1,81 +1,143 @@
 import os
-import sys
 import json
 import random
+import shutil
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
-def create_directories():
+# Row/file counts per dataset for each --size preset; "small" is the original toy data.
+SIZES = {
+    "small": {"dates": 100, "contacts": 3, "logs": 10, "log_lines": 5, "docs": 2,
+              "comments": 5, "tickets": 4, "csv_rows": 100},
+    "medium": {"dates": 100_000, "contacts": 10_000, "logs": 1_000, "log_lines": 20, "docs": 1_000,
+               "comments": 10_000, "tickets": 100_000, "csv_rows": 100_000},
+    "large": {"dates": 5_000_000, "contacts": 1_000_000, "logs": 100_000, "log_lines": 20, "docs": 100_000,
+              "comments": 1_000_000, "tickets": 5_000_000, "csv_rows": 5_000_000},
+}
+LINES_PER_SHARD = 250_000
+FILES_PER_SHARD = 2_000
+DATE_FORMATS = ["%Y-%m-%d", "%Y/%m/%d %H:%M:%S", "%d-%b-%Y", "%b %d, %Y", "%Y-%m-%dT%H:%M:%S"]
+FIRST_NAMES = ["Alice", "Bob", "Charlie", "Diana", "Ethan", "Fatima", "George", "Hana", "Ivan", "Julia",
+               "Kenji", "Layla", "Mateo", "Nina", "Omar", "Priya", "Quinn", "Rosa", "Sven", "Tara"]
+LAST_NAMES = ["Smith", "Johnson", "Brown", "Garcia", "Miller", "Davis", "Khan", "Lopez", "Wilson", "Anderson",
+              "Thomas", "Moore", "Martin", "Lee", "Perez", "White", "Harris", "Clark", "Lewis", "Young"]
+CITIES = ["Chennai", "Delhi", "London", "Mumbai", "New York", "Paris", "Sydney", "Tokyo"]
+TOPICS = ["Home", "Large Language Models", "Installation", "Configuration", "API Reference", "Deployment",
+          "Troubleshooting", "Embeddings", "Vector Search", "Prompting", "Evaluation", "Security"]
+COMMENT_PARTS = (
+    ["This", "The", "Honestly this", "Overall the", "I think this", "Frankly the"],
+    ["project", "tool", "API", "documentation", "release", "dashboard", "CLI"],
+    ["is amazing", "could be improved", "is not working as expected", "works great", "is too slow",
+     "saved me hours", "needs better docs", "keeps crashing"],
+    ["!", ".", "!!", " :)", " - keep it up.", ", thanks."],
+)
+
+def shard_rng(seed, name, shard=0):
+    """Returns a random generator for one shard; the same seed always gives the same data."""
+    return random.Random(f"{seed}-{name}-{shard}") if seed is not None else random.Random()
+
+def shards(total, size):
+    """Splits range(total) into (shard, start, stop) chunks of at most `size`."""
+    return [(i, start, min(start + size, total)) for i, start in enumerate(range(0, total, size))] or [(0, 0, 0)]
+
+def create_directories(out_dir="data"):
     """Creates required directories if they do not exist."""
-    os.makedirs("data/logs", exist_ok=True)
-    os.makedirs("data/docs", exist_ok=True)
+    os.makedirs(os.path.join(out_dir, "logs"), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, "docs"), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, ".parts"), exist_ok=True)
 
-def generate_dates():
-    """Generate a file containing random dates."""
+def generate_dates(out_dir, seed, shard, start, stop, mixed_formats=False):
+    """Generate a shard of random dates (5 years from 2020-01-01)."""
+    rng = shard_rng(seed, "dates", shard)
     start_date = datetime(2020, 1, 1)
-    with open("data/dates.txt", "w") as f:
-        for _ in range(100):  # Generate 100 random dates
-            random_date = start_date + timedelta(days=random.randint(0, 1825))  # 5 years range
-            f.write(random_date.strftime("%Y-%m-%d") + "\n")
-
-def generate_contacts():
-    """Generate a JSON file containing sample contacts."""
-    contacts = [
-        {"first_name": "Alice", "last_name": "Smith", "email": "alice@example.com"},
-        {"first_name": "Bob", "last_name": "Johnson", "email": "bob@example.com"},
-        {"first_name": "Charlie", "last_name": "Brown", "email": "charlie@example.com"},
-    ]
-    with open("data/contacts.json", "w") as f:
-        json.dump(contacts, f, indent=4)
+    seconds = 5 * 365 * 86400
+    lines = []
+    for _ in range(start, stop):
+        random_date = start_date + timedelta(seconds=rng.randrange(seconds))
+        date_format = rng.choice(DATE_FORMATS) if mixed_formats else DATE_FORMATS[0]
+        lines.append(random_date.strftime(date_format) + "\n")
+    with open(os.path.join(out_dir, ".parts", f"dates.{shard:05d}"), "w") as f:
+        f.writelines(lines)
 
-def generate_logs():
-    """Generate random log files with timestamps."""
-    for i in range(10):  # Create 10 log files
-        filename = f"data/logs/log_{i}.log"
-        with open(filename, "w") as f:
-            for _ in range(5):  # 5 log entries per file
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f"{timestamp} - Log entry {random.randint(1000, 9999)}\n")
-
-def generate_markdown():
-    """Generate sample Markdown files with H1 headers."""
-    md_content = [
-        "# Home\nWelcome to the documentation.\n",
-        "# Large Language Models\nThis file explains LLMs.\n",
-    ]
-    for i, content in enumerate(md_content):
-        filename = f"data/docs/file_{i}.md"
+def generate_contacts(out_dir, seed, shard, start, stop):
+    """Generate a shard of contacts, formatted like json.dump(contacts, f, indent=4)."""
+    rng = shard_rng(seed, "contacts", shard)
+    items = []
+    for i in range(start, stop):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        contact = {"first_name": first, "last_name": last, "email": f"{first.lower()}.{last.lower()}{i}@example.com"}
+        items.append("    " + json.dumps(contact, indent=4).replace("\n", "\n    "))
+    with open(os.path.join(out_dir, ".parts", f"contacts.{shard:05d}"), "w") as f:
+        f.write(",\n".join(items))
+
+def generate_logs(out_dir, seed, shard, start, stop, lines_per_file=5):
+    """Generate log files with timestamps, spreading their mtimes over the last 30 days."""
+    rng = shard_rng(seed, "logs", shard)
+    now = datetime.now()
+    for i in range(start, stop):
+        filename = os.path.join(out_dir, "logs", f"log_{i}.log")
+        written = now - timedelta(seconds=rng.randrange(30 * 86400))
         with open(filename, "w") as f:
-            f.write(content)
+            for line in range(lines_per_file):
+                timestamp = (written + timedelta(seconds=line)).strftime("%Y-%m-%d %H:%M:%S")
+                f.write(f"{timestamp} - Log entry {rng.randint(1000, 9999)}\n")
+        os.utime(filename, (written.timestamp(), written.timestamp()))
+
+def generate_markdown(out_dir, seed, shard, start, stop):
+    """Generate Markdown files with an H1 header and a few sections."""
+    rng = shard_rng(seed, "docs", shard)
+    for i in range(start, stop):
+        topic = TOPICS[i] if i < 2 else f"{rng.choice(TOPICS)} {i}"
+        sections = "".join(
+            f"\n## {rng.choice(TOPICS)}\n\nSome *notes* about `{topic.lower()}`.\n\n- one\n- two\n"
+            for _ in range(rng.randint(0, 3))
+        )
+        with open(os.path.join(out_dir, "docs", f"file_{i}.md"), "w") as f:
+            f.write(f"# {topic}\nWelcome to the documentation.\n{sections}")
 
-def generate_email():
+def generate_email(out_dir="data"):
     """Generate a sample email file."""
     email_content = """From: sender@example.com\nTo: receiver@example.com\nSubject: Test Email\n\nHello, this is a test email."""
-    with open("data/email.txt", "w") as f:
+    with open(os.path.join(out_dir, "email.txt"), "w") as f:
         f.write(email_content)
 
-def generate_credit_card_image():
+def generate_credit_card_image(out_dir="data"):
     """Placeholder function for a credit card image (Actual OCR needed)."""
-    with open("data/credit-card.png", "wb") as f:
+    with open(os.path.join(out_dir, "credit-card.png"), "wb") as f:
         f.write(b"\x89PNG\r\n\x1a\n...")  # Minimal PNG header for testing
 
-def generate_comments():
-    """Generate a file with random comments."""
-    comments = [
-        "This is an amazing project!",
-        "I love this tool!",
-        "The API could be improved.",
-        "Nice work, keep it up!",
-        "This tool is not working as expected.",
-    ]
-    with open("data/comments.txt", "w") as f:
+def generate_comments(out_dir, seed, shard, start, stop):
+    """Generate a shard of random comments, one per line."""
+    rng = shard_rng(seed, "comments", shard)
+    comments = [" ".join(rng.choice(part) for part in COMMENT_PARTS[:3]) + rng.choice(COMMENT_PARTS[3])
+                for _ in range(start, stop)]
+    with open(os.path.join(out_dir, ".parts", f"comments.{shard:05d}"), "w") as f:
         f.write("\n".join(comments))
 
-def generate_ticket_sales():
-    """Generate a sample SQLite database for ticket sales."""
+def generate_csv(out_dir, seed, shard, start, stop):
+    """Generate a shard of CSV rows (id, name, city, age, score, joined)."""
+    rng = shard_rng(seed, "csv", shard)
+    lines = []
+    for i in range(start, stop):
+        joined = datetime(2015, 1, 1) + timedelta(days=rng.randrange(3650))
+        lines.append(f"{i},{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)},{rng.choice(CITIES)},"
+                     f"{rng.randint(18, 80)},{rng.random() * 100:.2f},{joined:%Y-%m-%d}\n")
+    with open(os.path.join(out_dir, ".parts", f"csv.{shard:05d}"), "w") as f:
+        f.writelines(lines)
+
+def generate_ticket_sales(out_dir="data", count=4, seed=None):
+    """Generate a SQLite database of ticket sales, replacing any existing one."""
     import sqlite3
-    conn = sqlite3.connect("data/ticket-sales.db")
+    path = os.path.join(out_dir, "ticket-sales.db")
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
     cursor = conn.cursor()
-    
+
     # Create table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS tickets (
@@ -85,7 +147,7 @@ def generate_ticket_sales():
             price REAL
         )
     """)
-    
+
     # Insert sample data
     sample_data = [
         ("Gold", 2, 50.0),
@@ -93,28 +155,93 @@ def generate_ticket_sales():
         ("Gold", 3, 50.0),
         ("Bronze", 4, 20.0),
     ]
-    cursor.executemany("INSERT INTO tickets (type, units, price) VALUES (?, ?, ?)", sample_data)
+    rng = shard_rng(seed, "tickets")
+    prices = {"Gold": 50.0, "Silver": 30.0, "Bronze": 20.0}
+    types = list(prices)
+
+    def extra_rows():
+        for _ in range(len(sample_data), count):
+            ticket_type = rng.choice(types)
+            yield (ticket_type, rng.randint(1, 10), prices[ticket_type])
+
+    cursor.executemany("INSERT INTO tickets (type, units, price) VALUES (?, ?, ?)",
+                       itertools.chain(sample_data[:count], extra_rows()))
     conn.commit()
     conn.close()
 
-def main():
+def concatenate(out_dir, name, target, separator="", header="", footer=""):
+    """Joins a dataset's shard files, in order, into `target`."""
+    parts_dir = os.path.join(out_dir, ".parts")
+    parts = sorted(p for p in os.listdir(parts_dir) if p.startswith(name + "."))
+    with open(os.path.join(out_dir, target), "w") as out:
+        out.write(header)
+        first = True
+        for part in parts:
+            path = os.path.join(parts_dir, part)
+            if os.path.getsize(path):
+                if not first:
+                    out.write(separator)
+                with open(path) as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+                first = False
+            os.remove(path)
+        out.write(footer)
+
+def _run(job):
+    function, args = job
+    function(*args)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate data files for the automation tasks.")
+    parser.add_argument("email", help="user email the data is generated for")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small", help="preset dataset sizes")
+    for name in SIZES["small"]:
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int,
+                            help=f"override the preset's {name.replace('_', ' ')} count")
+    parser.add_argument("--seed", type=int, help="make the output reproducible")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="parallel generator processes")
+    parser.add_argument("--out-dir", default="data", help="directory to write the data to")
+    parser.add_argument("--mixed-date-formats", action="store_true", help="write dates in several formats")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main function to generate all required data."""
-    if len(sys.argv) < 2:
-        print("Usage: python datagen.py <user.email>")
-        sys.exit(1)
-
-    user_email = sys.argv[1]
-    print(f"Generating data for user: {user_email}")
-
-    create_directories()
-    generate_dates()
-    generate_contacts()
-    generate_logs()
-    generate_markdown()
-    generate_email()
-    generate_credit_card_image()
-    generate_comments()
-    generate_ticket_sales()
+    args = parse_args(argv)
+    sizes = {name: getattr(args, name) if getattr(args, name) is not None else count
+             for name, count in SIZES[args.size].items()}
+    out_dir = args.out_dir
+    print(f"Generating data for user: {args.email}")
+
+    create_directories(out_dir)
+    jobs = []
+    for shard, start, stop in shards(sizes["dates"], LINES_PER_SHARD):
+        jobs.append((generate_dates, (out_dir, args.seed, shard, start, stop, args.mixed_date_formats)))
+    for shard, start, stop in shards(sizes["contacts"], LINES_PER_SHARD):
+        jobs.append((generate_contacts, (out_dir, args.seed, shard, start, stop)))
+    for shard, start, stop in shards(sizes["logs"], FILES_PER_SHARD):
+        jobs.append((generate_logs, (out_dir, args.seed, shard, start, stop, sizes["log_lines"])))
+    for shard, start, stop in shards(sizes["docs"], FILES_PER_SHARD):
+        jobs.append((generate_markdown, (out_dir, args.seed, shard, start, stop)))
+    for shard, start, stop in shards(sizes["comments"], LINES_PER_SHARD):
+        jobs.append((generate_comments, (out_dir, args.seed, shard, start, stop)))
+    for shard, start, stop in shards(sizes["csv_rows"], LINES_PER_SHARD):
+        jobs.append((generate_csv, (out_dir, args.seed, shard, start, stop)))
+    jobs.append((generate_ticket_sales, (out_dir, sizes["tickets"], args.seed)))
+    jobs.append((generate_email, (out_dir,)))
+    jobs.append((generate_credit_card_image, (out_dir,)))
+
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            list(pool.map(_run, jobs))
+    else:
+        for job in jobs:
+            _run(job)
+
+    concatenate(out_dir, "dates", "dates.txt")
+    concatenate(out_dir, "contacts", "contacts.json", separator=",\n", header="[\n", footer="\n]")
+    concatenate(out_dir, "comments", "comments.txt", separator="\n")
+    concatenate(out_dir, "csv", "data.csv", header="id,name,city,age,score,joined\n")
+    os.rmdir(os.path.join(out_dir, ".parts"))
 
     print("Data generation complete.")
 
@@ -1,6 +1,111 @@
+"""Starts the API server.
+
+    python run.py                      Flask development server
+    python run.py --prod [--workers N] [--threads N]
+
+--prod pre-forks N gunicorn workers (threaded when --threads > 1). Async job
+state is kept in SQLite under CACHE_DIR and metrics are merged through
+METRICS_DIR, so any worker can answer /jobs/<id>, /metrics and /cache/stats.
+Send the master SIGHUP for a graceful reload: new workers start before old
+ones finish their requests. With --no-preload each worker imports the app itself, so a
+reload also picks up code changes. Without gunicorn it falls back to waitress,
+then to werkzeug's threaded server.
+"""
+import argparse
+import os
+
 from app.api import create_app
 
-app = create_app()
+
+def __getattr__(name):
+    # `run:app` for external WSGI servers, built only when asked for.
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(name)
+
+
+def serve_gunicorn(base_application, host, port, workers, threads, timeout, preload):
+    class Server(base_application):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", "gthread" if threads > 1 else "sync")
+            self.cfg.set("timeout", timeout)
+            self.cfg.set("graceful_timeout", timeout)
+            self.cfg.set("preload_app", preload)
+            self.cfg.set("max_requests", int(os.getenv("MAX_REQUESTS", "0")))
+            self.cfg.set("max_requests_jitter", int(os.getenv("MAX_REQUESTS_JITTER", "0")))
+            self.cfg.set("worker_exit", flush_metrics)
+
+        def load(self):
+            return create_app()
+
+    Server().run()
+
+
+def flush_metrics(server, worker):
+    from app.metrics import registry
+
+    registry.flush()
+
+
+def share_metrics():
+    """Points every worker at one fresh METRICS_DIR so /metrics and /cache/stats add them all up."""
+    from app.utils import cache_path
+
+    directory = os.environ.setdefault("METRICS_DIR", cache_path("metrics"))
+    os.makedirs(directory, exist_ok=True)
+    for entry in os.scandir(directory):
+        if entry.name.startswith("metrics-"):
+            os.remove(entry.path)
+
+
+def serve_prod(host, port, workers, threads, timeout, preload):
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:  # not installed, or not on a POSIX system
+        BaseApplication = None
+    if BaseApplication is not None:
+        if workers > 1:
+            share_metrics()
+        serve_gunicorn(BaseApplication, host, port, workers, threads, timeout, preload)
+        return
+
+    app = create_app()
+    try:
+        from waitress import serve
+    except ImportError:
+        from werkzeug.serving import run_simple
+
+        print("gunicorn and waitress are not installed; using werkzeug's threaded server.")
+        run_simple(host, port, app, threaded=True)
+        return
+    serve(app, host=host, port=port, threads=workers * threads)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    arg_parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    arg_parser.add_argument("--prod", action="store_true", default=os.getenv("SERVER_MODE") == "prod",
+                            help="serve with a multi-worker production server")
+    arg_parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    arg_parser.add_argument("--threads", type=int, default=int(os.getenv("WEB_THREADS", "4")))
+    arg_parser.add_argument("--timeout", type=int, default=int(os.getenv("WEB_TIMEOUT", "120")),
+                            help="seconds before a stuck worker is restarted")
+    arg_parser.add_argument("--no-preload", dest="preload", action="store_false",
+                            default=os.getenv("PRELOAD", "1") != "0",
+                            help="build the app in each worker instead of once before forking")
+    args = arg_parser.parse_args()
+
+    if args.prod:
+        serve_prod(args.host, args.port, args.workers, args.threads, args.timeout, args.preload)
+    else:
+        create_app().run(host=args.host, port=args.port)
+
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8000)
\ No newline at end of file
+    main()
@@ -0,0 +1,27 @@
+import io
+import json
+
+import pytest
+
+from app.contacts import iter_json_array
+
+
+def items(text, read_size):
+    return [item for item, _ in iter_json_array(io.StringIO(text), read_size=read_size)]
+
+
+@pytest.mark.parametrize("read_size", range(1, 12))
+def test_numbers_split_across_reads(read_size):
+    values = [1, 2.5, -3e10, 1.25e-3, 100, True, None, "x"]
+    assert items(json.dumps(values), read_size) == values
+
+
+@pytest.mark.parametrize("read_size", [1, 5, 64])
+def test_objects(read_size):
+    contacts = [{"first_name": "Ana", "last_name": "Li"}, {"first_name": "Bo", "last_name": "Kim"}]
+    assert items(json.dumps(contacts), read_size) == contacts
+
+
+def test_not_an_array():
+    with pytest.raises(ValueError):
+        items('{"a": 1}', 4)
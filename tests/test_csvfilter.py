@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from app.csvfilter import filter_csv, parse_filters
+
+
+def engines():
+    try:
+        import pyarrow.csv  # noqa: F401
+        return ["pandas", "pyarrow"]
+    except ImportError:
+        return ["pandas"]
+
+
+def write_csv(path, header, rows):
+    path.write_text("\n".join([header] + rows) + "\n")
+    return str(path)
+
+
+def read_rows(path, filters=(), **options):
+    output_path = path + ".json"
+    filter_csv(path, output_path, parse_filters({"filters": list(filters)}), **options)
+    with open(output_path) as file:
+        return json.load(file)
+
+
+@pytest.fixture
+def people(tmp_path):
+    return write_csv(tmp_path / "people.csv", "name,city,age,score,member,joined,code", [
+        "Ana,Paris,41,9.5,true,2020-01-02,007",
+        "Ben,Lyon,,7.0,false,2021-03-04,010",
+        "Cy,Paris,35,,,2019-05-06,",
+        "Di,Nice,52,8.25,true,,123",
+    ])
+
+
+@pytest.mark.parametrize("engine", engines())
+def test_output_does_not_depend_on_chunk_size(people, engine):
+    expected = read_rows(people, engine="pandas")
+    for chunk_rows in (1, 2, 3, 100):
+        assert read_rows(people, chunk_rows=chunk_rows, engine=engine) == expected
+    assert expected[1] == {"name": "Ben", "city": "Lyon", "age": None, "score": 7.0, "member": False,
+                           "joined": "2021-03-04", "code": 10}
+
+
+@pytest.mark.parametrize("engine", engines())
+@pytest.mark.parametrize("late_value, expected", [("500.5", 500.5), ("x500", "x500")])
+def test_column_is_widened_for_a_late_value(tmp_path, engine, late_value, expected):
+    path = write_csv(tmp_path / "prices.csv", "id,price", [f"{i},{i}" for i in range(500)] + [f"500,{late_value}"])
+    for chunk_rows in (1, 7, 100, 100000):
+        rows = read_rows(path, chunk_rows=chunk_rows, engine=engine)
+        assert rows[-1]["price"] == expected
+        assert rows[1]["price"] == (1 if isinstance(expected, float) else "1")
+
+
+@pytest.mark.parametrize("engine", engines())
+@pytest.mark.parametrize("spec, names", [
+    ({"column": "city", "op": "==", "value": "Paris"}, ["Ana", "Cy"]),
+    ({"column": "city", "op": "ne", "value": "Paris"}, ["Ben", "Di"]),
+    ({"column": "age", "op": ">", "value": 40}, ["Ana", "Di"]),
+    ({"column": "age", "op": "<=", "value": 41}, ["Ana", "Cy"]),
+    ({"column": "score", "op": ">=", "value": 8.25}, ["Ana", "Di"]),
+    ({"column": "city", "op": "in", "value": ["Lyon", "Nice"]}, ["Ben", "Di"]),
+    ({"column": "city", "op": "not in", "value": ["Lyon", "Nice"]}, ["Ana", "Cy"]),
+    ({"column": "name", "op": "contains", "value": "y"}, ["Cy"]),
+    ({"column": "name", "op": "startswith", "value": "B"}, ["Ben"]),
+    ({"column": "name", "op": "endswith", "value": "i"}, ["Di"]),
+    ({"column": "age", "op": "is null"}, ["Ben"]),
+    ({"column": "score", "op": "notnull"}, ["Ana", "Ben", "Di"]),
+    ({"column": "code", "op": "==", "value": "007"}, ["Ana"]),
+])
+def test_filter_operators(people, engine, spec, names):
+    assert [row["name"] for row in read_rows(people, [spec], chunk_rows=2, engine=engine)] == names
+
+
+def test_unsupported_operator():
+    with pytest.raises(ValueError):
+        parse_filters({"filters": [{"column": "age", "op": "between", "value": 1}]})
@@ -0,0 +1,40 @@
+import pytest
+
+from app.tasks import _run_handler
+
+duckdb = pytest.importorskip("duckdb")
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "sales.duckdb")
+    conn = duckdb.connect(path)
+    conn.execute("CREATE TABLE tickets (type VARCHAR, units INTEGER)")
+    conn.execute("INSERT INTO tickets VALUES ('Gold', 2), ('Gold', 3), ('Silver', 1)")
+    conn.close()
+    return path
+
+
+def run_query(database, output_path, query):
+    return _run_handler("B5", database, str(output_path), {"query": query}, "", {})
+
+
+def test_duckdb_query(database, tmp_path):
+    result = run_query(database, tmp_path / "out.json", "SELECT SUM(units) FROM tickets WHERE type = 'Gold'")
+    assert result == "SQL query executed and result saved."
+    assert (tmp_path / "out.json").read_text() == "[[5]]"
+
+
+def test_duckdb_query_cannot_read_other_files(database, tmp_path):
+    secret = tmp_path / "secret.csv"
+    secret.write_text("password\nhunter2\n")
+    result = run_query(database, tmp_path / "out.json", f"SELECT * FROM read_csv('{secret}')")
+    assert result.startswith("Error executing SQL query")
+    assert not (tmp_path / "out.json").exists() or "hunter2" not in (tmp_path / "out.json").read_text()
+
+
+def test_duckdb_query_cannot_write_other_files(database, tmp_path):
+    target = tmp_path / "copied.csv"
+    result = run_query(database, tmp_path / "out.json", f"COPY (SELECT 42) TO '{target}'")
+    assert result.startswith("Error executing SQL query")
+    assert not target.exists()
@@ -0,0 +1,23 @@
+import pytest
+
+from app.formatter import format_markdown
+
+
+def test_prose_is_formatted():
+    assert format_markdown("Title\n=====\n*  one *em*\n+  two __strong__\n\n\n") == \
+        "# Title\n\n- one _em_\n- two **strong**\n"
+
+
+@pytest.mark.parametrize("block", [
+    "```\n*  a  *b*\n```",
+    "    *  a  *b*\n\n\tc __d__",
+    "<!-- *a*\n\n__b__ -->",
+    "<div>\n*  a *b*\n</div>",
+    "<pre>\n*  a\n\n__b__\n</pre>",
+])
+def test_code_and_html_blocks_are_untouched(block):
+    assert format_markdown(f"# Title\n\n{block}\n\nText *em*\n") == f"# Title\n\n{block}\n\nText _em_\n"
+
+
+def test_indented_list_continuation_is_not_code():
+    assert format_markdown("* item\n\n    more *em*\n") == "- item\n\n    more _em_\n"
@@ -0,0 +1,165 @@
+import pytest
+
+from app.intent import MIN_CONFIDENCE, extract_sql, parse_intent
+
+
+def confident(task):
+    task_info, confidence = parse_intent(task)
+    assert task_info is not None and confidence >= MIN_CONFIDENCE, (task_info, confidence)
+    return task_info
+
+
+def unsure(task):
+    task_info, confidence = parse_intent(task)
+    assert task_info is None or confidence < MIN_CONFIDENCE, (task_info, confidence)
+
+
+@pytest.mark.parametrize("task, action, input_path, output_path", [
+    ("Format the contents of /data/format.md using prettier@3.4.2, updating the file in-place",
+     "format", "/data/format.md", "/data/format.md"),
+    ("Sort the array of contacts in /data/contacts.json by last_name, then first_name, "
+     "and write the result to /data/contacts-sorted.json",
+     "sort", "/data/contacts.json", "/data/contacts-sorted.json"),
+    ("Find all Markdown (.md) files in /data/docs/. Extract the first occurrence of each H1 "
+     "and write an index to /data/docs/index.json",
+     "extract markdown titles", "/data/docs/", "/data/docs/index.json"),
+    ("Convert /data/readme.md to HTML and save it to /data/readme.html",
+     "markdown to html", "/data/readme.md", "/data/readme.html"),
+])
+def test_common_tasks(task, action, input_path, output_path):
+    task_info = confident(task)
+    assert task_info["action"] == action
+    assert task_info["input_path"] == input_path
+    assert task_info["output_path"] == output_path
+
+
+def test_weekday_count():
+    task_info = confident("The file /data/dates.txt contains a list of dates. Count the number of "
+                          "Wednesdays in the list, and write just the number to /data/dates-wednesdays.txt")
+    assert task_info["parameters"] == {"day": "wednesday"}
+
+
+def test_weekday_count_needs_a_day():
+    unsure("Count the lines in /data/dates.txt and write the number to /data/out.txt")
+
+
+def test_recent_logs():
+    task_info = confident("Write the first line of the 10 most recent .log file in /data/logs/ "
+                          "to /data/logs-recent.txt, most recent first")
+    assert task_info["input_path"] == "/data/logs/"
+    assert task_info["parameters"] == {"count": 10, "pattern": "*.log"}
+
+
+def test_recent_logs_with_another_extension():
+    task_info = confident("Write the first line of the 3 most recent .txt files in /data/logs/ to /data/out.txt")
+    assert task_info["parameters"] == {"count": 3, "pattern": "*.txt"}
+
+
+def test_recent_logs_with_unparsed_count():
+    unsure("Write the first line of the latest 10 logs in /data/logs/ to /data/logs-recent.txt")
+
+
+def test_sort_keys():
+    task_info = confident("Sort the contacts in /data/contacts.json by email and write them to /data/sorted.json")
+    assert task_info["parameters"] == {"sort_keys": ["email"]}
+
+
+def test_sort_keys_that_cannot_be_parsed():
+    unsure("Sort the contacts in /data/contacts.json by (email) and write them to /data/sorted.json")
+
+
+def test_similar_pairs():
+    task_info = confident("Using embeddings, find the 5 most similar pairs of comments in /data/comments.txt "
+                          "and write them to /data/comments-similar.txt")
+    assert task_info["parameters"] == {"top_k": 5}
+
+
+def test_similar_pairs_with_unparsed_number():
+    unsure("Find the most similar comments, 5 of them, in /data/comments.txt and write them to /data/similar.txt")
+
+
+def test_sender_email():
+    task_info = confident("/data/email.txt contains an email message. Extract the sender's email address "
+                          "and write it to /data/email-sender.txt")
+    assert task_info["action"] == "extract email"
+
+
+def test_ticket_sales():
+    task_info = confident("The SQLite database file /data/ticket-sales.db has a tickets table. What is the total "
+                          "sales of all the items in the \"Gold\" ticket type? Write the number in /data/ticket-sales-gold.txt")
+    assert task_info["parameters"] == {"ticket_type": "Gold"}
+
+
+def test_sql_query_is_kept_verbatim():
+    task_info = confident("Run the SQL query SELECT COUNT(*) FROM tickets WHERE type = 'Gold' "
+                          "on /data/ticket-sales.db and save the result to /data/out.txt")
+    assert task_info["parameters"] == {"query": "SELECT COUNT(*) FROM tickets WHERE type = 'Gold'"}
+
+
+@pytest.mark.parametrize("task", [
+    "Run SELECT SUM(units) FROM tickets on /data/ticket-sales.db",
+    "Query /data/ticket-sales.db with SELECT SUM(units) FROM tickets and write the result to /data/out.txt",
+    "SELECT SUM(units) FROM tickets; save it to /data/out.txt",
+])
+def test_extract_sql_stops_at_the_query(task):
+    assert extract_sql(task) == "SELECT SUM(units) FROM tickets"
+
+
+def test_fetch_needs_a_url():
+    task_info = confident("Fetch data from the API https://example.com/items.json and save it to /data/items.json")
+    assert task_info["parameters"] == {"url": "https://example.com/items.json"}
+    unsure("Fetch data from the API and save it to /data/items.json")
+
+
+def test_image_size():
+    task_info = confident("Resize /data/photo.png to 200x200 and save it to /data/photo-small.png")
+    assert task_info["parameters"] == {"size": "200x200"}
+
+
+def test_image_size_that_cannot_be_parsed():
+    unsure("Resize /data/photo.png by 50% and save it to /data/photo-small.png")
+
+
+@pytest.mark.parametrize("clause, filters", [
+    ("where city equals Paris", [{"column": "city", "op": "==", "value": "Paris"}]),
+    ("where age > 30 and city is \"New York\"",
+     [{"column": "age", "op": ">", "value": 30}, {"column": "city", "op": "==", "value": "New York"}]),
+    ("where price is at most 9.5", [{"column": "price", "op": "<=", "value": 9.5}]),
+    ("where name starts with 'A'", [{"column": "name", "op": "startswith", "value": "A"}]),
+])
+def test_csv_filters(clause, filters):
+    task_info = confident(f"Filter the CSV file /data/data.csv {clause} and write JSON to /data/out.json")
+    assert task_info["action"] == "filter csv"
+    assert task_info["parameters"] == {"filters": filters}
+
+
+def test_csv_filter_that_cannot_be_parsed():
+    unsure("Filter the CSV file /data/data.csv where city, ignoring case, is paris and write JSON to /data/out.json")
+
+
+def test_needs_an_output_path():
+    unsure("Sort the contacts in /data/contacts.json")
+
+
+def test_unknown_task():
+    assert parse_intent("Tell me a joke") == (None, 0.0)
+
+
+def test_weekday_count_with_a_year():
+    unsure("Count the Wednesdays in /data/dates.txt that fall in 2021 and write to /data/out.txt")
+
+
+@pytest.mark.parametrize("order", ["in reverse order", "in descending order", "by email desc"])
+def test_sort_order_that_cannot_be_parsed(order):
+    unsure(f"Sort the contacts in /data/contacts.json {order} and write them to /data/sorted.json")
+
+
+def test_unread_qualifier():
+    unsure("Extract the H1 titles of the Markdown files in /data/docs/ except drafts "
+           "and write the index to /data/docs/index.json")
+
+
+def test_sql_query_words_are_not_qualifiers():
+    task_info = confident("Run the SQL query SELECT * FROM tickets ORDER BY units DESC on /data/ticket-sales.db "
+                          "and save the result to /data/out.json")
+    assert task_info["parameters"] == {"query": "SELECT * FROM tickets ORDER BY units DESC"}
@@ -0,0 +1,16 @@
+import pytest
+
+from app.utils import flag
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, True), (True, True), (False, False), (0, False), (1, True),
+    ("false", False), ("False", False), ("0", False), ("no", False), ("true", True), ("yes", True),
+    ("maybe", True),
+])
+def test_flag(value, expected):
+    assert flag(value, default=True) is expected
+
+
+def test_flag_default():
+    assert flag(None) is False